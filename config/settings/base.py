@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/1.11/ref/settings/
 from ipaddress import IPv4Network
 from os import environ
 from pathlib import Path
+from tempfile import gettempdir
 from typing import List
 
 import dj_database_url
@@ -320,6 +321,9 @@ RQ_QUEUES = {
     },
 }
 RQ = {"WORKER_CLASS": "metadeploy.rq_worker.ConnectionClosingWorker"}
+# How many jobs each RQ worker process runs at once, each in its own work
+# horse:
+RQ_WORKER_CONCURRENCY = env("RQ_WORKER_CONCURRENCY", type_=int, default=1)
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
@@ -351,6 +355,51 @@ TOKEN_LIFETIME_MINUTES = env("TOKEN_LIFETIME_MINUTES", type_=int, default=10)
 PREFLIGHT_LIFETIME_MINUTES = env("PREFLIGHT_LIFETIME_MINUTES", type_=int, default=10)
 
 
+# Extracted repository archives, shared by all workers on a host. Set the
+# maximum size (in bytes) to 0 to disable the cache:
+REPO_ARCHIVE_CACHE_DIR = env(
+    "REPO_ARCHIVE_CACHE_DIR", default=str(Path(gettempdir()) / "metadeploy-archives")
+)
+REPO_ARCHIVE_CACHE_MAX_SIZE = env(
+    "REPO_ARCHIVE_CACHE_MAX_SIZE", type_=int, default=1024 ** 3
+)
+# Hardlinking is cheaper than copying, but any task that writes to a file
+# in place would then also write to the cached copy:
+REPO_ARCHIVE_CACHE_HARDLINK = env(
+    "REPO_ARCHIVE_CACHE_HARDLINK", default=False, type_=boolish
+)
+
+# How long the job dispatcher waits for a notification before it sweeps for
+# pending Jobs anyway:
+JOB_DISPATCHER_SWEEP_SECONDS = env(
+    "JOB_DISPATCHER_SWEEP_SECONDS", type_=int, default=60
+)
+# How long a Job may stay claimed by the enqueuer without its RQ job
+# turning up before it is put back to be enqueued again:
+JOB_CLAIM_TIMEOUT_SECONDS = env("JOB_CLAIM_TIMEOUT_SECONDS", type_=int, default=300)
+
+# Job progress notifications for the same Job arriving within this many
+# milliseconds of each other are merged into one. Set to 0 to send every
+# notification:
+PUSH_COALESCE_WINDOW_MS = env("PUSH_COALESCE_WINDOW_MS", type_=int, default=250)
+
+# Job logs are obscured record by record as they're logged, and stored once
+# this many characters have built up (and at the end of each step). The
+# last JOB_LOG_TAIL_LINES lines of a running Job's log are also shown to
+# its owner:
+JOB_LOG_FLUSH_SIZE = env("JOB_LOG_FLUSH_SIZE", type_=int, default=64 * 1024)
+JOB_LOG_TAIL_LINES = env("JOB_LOG_TAIL_LINES", type_=int, default=100)
+
+# How many database calls each web process's websocket consumers may have
+# running at once. Keep this below ASGI_THREADS, if that's set:
+WEBSOCKET_DB_CONCURRENCY = env("WEBSOCKET_DB_CONCURRENCY", type_=int, default=8)
+
+# How long (in seconds) to keep serialized product, version and plan
+# responses. Saving any catalog model invalidates them all. Set to 0 to
+# disable the cache:
+CATALOG_CACHE_TIMEOUT = env("CATALOG_CACHE_TIMEOUT", type_=int, default=60 * 60)
+
+
 # Raven / Sentry
 SENTRY_DSN = env("SENTRY_DSN", default="")
 
@@ -415,6 +464,7 @@ LOGGING = {
         "rq.worker": {"handlers": ["rq_console"], "level": "DEBUG"},
         "metadeploy.multisalesforce": {"handlers": ["console"], "level": "DEBUG"},
         "metadeploy.api.jobs": {"handlers": ["console"], "level": "DEBUG"},
+        "metadeploy.consumers": {"handlers": ["console"], "level": "INFO"},
         "metadeploy.logging_middleware": {
             "handlers": ["console"],
             "level": "DEBUG",
@@ -1,3 +1,17 @@
 from .base import *  # NOQA
 
 CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+# Keep tests' cache entries out of the development Redis, and let
+# metadeploy/conftest.py clear them between tests:
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Tests that need the archive cache turn it on with the settings fixture:
+REPO_ARCHIVE_CACHE_MAX_SIZE = 0
+
+# Tests that need progress notifications coalesced turn it on with the
+# settings fixture:
+PUSH_COALESCE_WINDOW_MS = 0
+
+# Tests that need catalog responses cached turn it on with the settings
+# fixture:
+CATALOG_CACHE_TIMEOUT = 0
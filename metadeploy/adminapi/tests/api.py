@@ -1,4 +1,5 @@
 import pytest
+from django.urls import reverse
 from rest_framework.test import APIClient
 
 
@@ -208,6 +209,26 @@ class TestPlanViewSet:
         )
         assert response.status_code == 400
 
+    def test_update__invalidates_catalog(
+        self, settings, admin_api_client, plan_factory
+    ):
+        settings.CATALOG_CACHE_TIMEOUT = 60
+        plan = plan_factory()
+        public_url = reverse("plan-detail", kwargs={"pk": plan.id})
+        assert APIClient().get(public_url).json()["title"] == "Sample plan"
+
+        response = admin_api_client.put(
+            f"http://testserver/admin/rest/plans/{plan.id}",
+            {
+                "title": "Changed",
+                "version": f"http://testserver/admin/rest/versions/{plan.version.id}",
+            },
+            format="json",
+        )
+        assert response.status_code == 200, response.json()
+
+        assert APIClient().get(public_url).json()["title"] == "Changed"
+
     def test_ipaddress_restriction(self, user_factory, plan_factory):
         client = APIClient(REMOTE_ADDR="8.8.8.8")
         user = user_factory(is_staff=True)
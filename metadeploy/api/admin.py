@@ -38,6 +38,20 @@ class PlanMixin:
     version.admin_order_field = "plan__version__label"
 
 
+class HasErrorsFilter(admin.SimpleListFilter):
+    title = "has errors"
+    parameter_name = "has_errors"
+
+    def lookups(self, request, model_admin):
+        return (("yes", "Yes"), ("no", "No"))
+
+    def queryset(self, request, queryset):
+        if self.value() == "yes":
+            return queryset.filter(error_count__gt=0)
+        if self.value() == "no":
+            return queryset.filter(error_count=0)
+
+
 @admin.register(AllowedList)
 class AllowedListAdmin(admin.ModelAdmin):
     list_display = ("title", "description")
@@ -59,19 +73,23 @@ class AllowedListOrgAdmin(admin.ModelAdmin):
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin, PlanMixin):
     autocomplete_fields = ("plan", "steps", "user")
-    list_filter = ("status", "plan__version__product")
+    list_filter = ("status", HasErrorsFilter, "plan__version__product")
     list_display = (
         "user",
         "plan_title",
         "product",
         "version",
         "status",
+        "error_count",
+        "warning_count",
         "org_type",
         "org_name",
         "enqueued_at",
     )
     list_select_related = ("user", "plan", "plan__version", "plan__version__product")
     search_fields = ("user", "plan", "org_name")
+    exclude = ("log",)
+    readonly_fields = ("full_log",)
 
 
 @admin.register(PlanTemplate)
@@ -107,8 +125,17 @@ class PlanSlugAdmin(admin.ModelAdmin):
 @admin.register(PreflightResult)
 class PreflightResult(admin.ModelAdmin, PlanMixin):
     autocomplete_fields = ("plan", "user")
-    list_filter = ("status", "is_valid", "plan__version__product")
-    list_display = ("user", "status", "is_valid", "plan_title", "product", "version")
+    list_filter = ("status", "is_valid", HasErrorsFilter, "plan__version__product")
+    list_display = (
+        "user",
+        "status",
+        "is_valid",
+        "error_count",
+        "warning_count",
+        "plan_title",
+        "product",
+        "version",
+    )
     list_select_related = ("user", "plan", "plan__version", "plan__version__product")
     search_fields = ("user", "plan", "exception")
 
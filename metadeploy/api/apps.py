@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     name = "metadeploy.api"
     verbose_name = "API"
+
+    def ready(self):
+        from .catalog_cache import connect_signals
+
+        connect_signals()
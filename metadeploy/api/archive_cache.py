@@ -0,0 +1,197 @@
+"""
+A host-local cache of extracted repository archives.
+
+Every preflight and Job needs a checkout of the same handful of repos at
+the same handful of commits. Rather than downloading and extracting a
+zipball each time, we keep extracted trees on disk, keyed by owner, repo
+name and resolved commit SHA, and copy (or hardlink) them into each
+job's working directory.
+
+The cache directory is shared by all RQ workers on a host, so every
+mutation happens under an exclusive ``flock`` on a lock file in the
+cache root, and every read under a shared one. Entries are evicted
+least-recently-used first once the total size exceeds the configured
+maximum; an entry's mtime is bumped on each hit to record its use.
+"""
+
+import contextlib
+import fcntl
+import logging
+import os
+import shutil
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .constants import REDIS_ARCHIVE_CACHE_STAT_KEY
+
+logger = logging.getLogger(__name__)
+
+STATS = ("hits", "misses", "evictions")
+LOCK_FILE_NAME = ".lock"
+SIZE_SUFFIX = ".size"
+STAGING_PREFIX = ".staging-"
+
+
+def record_stat(stat, amount=1):
+    key = REDIS_ARCHIVE_CACHE_STAT_KEY.format(stat=stat)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, amount)
+    except ValueError:  # pragma: nocover
+        # The key was evicted between the add and the incr; losing one
+        # sample is fine.
+        pass
+
+
+def get_stats():
+    return {
+        stat: cache.get(REDIS_ARCHIVE_CACHE_STAT_KEY.format(stat=stat), 0)
+        for stat in STATS
+    }
+
+
+def tree_size(path):
+    size = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            size += os.lstat(os.path.join(dirpath, filename)).st_size
+    return size
+
+
+def copy_tree_contents(src, dest, *, hardlink=False):
+    """
+    Copy the contents of src into the already-existing directory dest.
+    """
+    copy_function = os.link if hardlink else shutil.copy2
+    for name in os.listdir(src):
+        src_path = os.path.join(src, name)
+        dest_path = os.path.join(dest, name)
+        if os.path.isdir(src_path) and not os.path.islink(src_path):
+            shutil.copytree(
+                src_path, dest_path, symlinks=True, copy_function=copy_function
+            )
+        elif os.path.islink(src_path):
+            os.symlink(os.readlink(src_path), dest_path)
+        else:
+            copy_function(src_path, dest_path)
+
+
+class ArchiveCache:
+    def __init__(self, root, max_size, *, hardlink=False):
+        self.root = root
+        self.max_size = max_size
+        self.hardlink = hardlink
+        os.makedirs(self.root, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls):
+        """
+        Return the configured cache, or None if caching is disabled.
+        """
+        if settings.REPO_ARCHIVE_CACHE_MAX_SIZE <= 0:
+            return None
+        return cls(
+            settings.REPO_ARCHIVE_CACHE_DIR,
+            settings.REPO_ARCHIVE_CACHE_MAX_SIZE,
+            hardlink=settings.REPO_ARCHIVE_CACHE_HARDLINK,
+        )
+
+    def entry_path(self, *, owner, repo_name, sha):
+        return os.path.join(self.root, f"{owner}.{repo_name}.{sha}")
+
+    @contextlib.contextmanager
+    def _lock(self, operation):
+        with open(os.path.join(self.root, LOCK_FILE_NAME), "a") as lock_file:
+            fcntl.flock(lock_file, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _entries(self):
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            yield path
+
+    def _entry_size(self, path):
+        try:
+            with open(path + SIZE_SUFFIX) as size_file:
+                return int(size_file.read())
+        except (OSError, ValueError):
+            return tree_size(path)
+
+    def _remove_entry(self, path):
+        shutil.rmtree(path, ignore_errors=True)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path + SIZE_SUFFIX)
+
+    def _evict(self, *, keep):
+        """
+        Remove least-recently-used entries until the cache fits in
+        max_size. The entry at ``keep`` is never evicted. Must be called
+        with the exclusive lock held.
+        """
+        entries = sorted(
+            (
+                (os.stat(path).st_mtime, path, self._entry_size(path))
+                for path in self._entries()
+            )
+        )
+        total = sum(size for _, _, size in entries)
+        evicted = 0
+        for _, path, size in entries:
+            if total <= self.max_size:
+                break
+            if path == keep:
+                continue
+            self._remove_entry(path)
+            total -= size
+            evicted += 1
+        if evicted:
+            logger.info(f"Evicted {evicted} repository archive(s) from cache.")
+            record_stat("evictions", evicted)
+
+    def checkout(self, *, owner, repo_name, sha, dest, populate):
+        """
+        Fill the directory ``dest`` with the tree of owner/repo_name at
+        sha. If dest is None, just make sure the tree is cached.
+
+        On a miss, ``populate`` is called with an empty directory to
+        extract the archive into. It should return False if the archive
+        could not be safely extracted, in which case nothing is cached
+        and this returns False too.
+        """
+        entry = self.entry_path(owner=owner, repo_name=repo_name, sha=sha)
+
+        with self._lock(fcntl.LOCK_SH):
+            if os.path.isdir(entry):
+                os.utime(entry)
+                if dest is not None:
+                    copy_tree_contents(entry, dest, hardlink=self.hardlink)
+                record_stat("hits")
+                return True
+
+        record_stat("misses")
+        staging = os.path.join(self.root, f"{STAGING_PREFIX}{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            if not populate(staging):
+                return False
+            if dest is not None:
+                copy_tree_contents(staging, dest, hardlink=self.hardlink)
+            size = tree_size(staging)
+            with self._lock(fcntl.LOCK_EX):
+                if not os.path.isdir(entry):
+                    # Another worker may have populated this entry while
+                    # we were downloading; theirs is as good as ours.
+                    os.rename(staging, entry)
+                    with open(entry + SIZE_SUFFIX, "w") as size_file:
+                        size_file.write(str(size))
+                self._evict(keep=entry)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return True
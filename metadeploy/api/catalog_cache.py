@@ -0,0 +1,157 @@
+"""
+A cache of the public catalog API responses.
+
+Products, Versions, Plans and Steps only change when an admin edits
+them, yet every page load serializes them afresh. Instead, we cache each
+serialized list and detail response, keyed by the request URL, the
+active language, and the AllowedLists the user can see through (which
+is all ProductSerializer and PlanSerializer vary on). The URL includes
+the scheme and host, as responses can contain absolute URLs built from
+them (of images in local storage, say).
+
+Every key also includes a catalog generation token. Saving or deleting
+any catalog model replaces the token, which orphans every cached
+response at once; the orphans then expire on their own.
+
+Cached responses carry an ETag, so a client that already has the
+current body gets an empty 304 instead.
+"""
+
+import hashlib
+import json
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.http import parse_etags, quote_etag
+from django.utils.translation import get_language
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .constants import REDIS_CATALOG_GENERATION_KEY, REDIS_CATALOG_RESPONSE_KEY
+from .models import (
+    AllowedList,
+    Plan,
+    PlanSlug,
+    PlanTemplate,
+    Product,
+    ProductCategory,
+    ProductSlug,
+    Step,
+    Version,
+)
+
+# Changes to AllowedListOrg don't need to be here, as they change the
+# visibility fingerprint of the affected users instead:
+CATALOG_MODELS = (
+    AllowedList,
+    Plan,
+    PlanSlug,
+    PlanTemplate,
+    Product,
+    ProductCategory,
+    ProductSlug,
+    Step,
+    Version,
+)
+
+
+def get_generation():
+    generation = cache.get(REDIS_CATALOG_GENERATION_KEY)
+    if generation is None:
+        cache.add(REDIS_CATALOG_GENERATION_KEY, uuid4().hex, timeout=None)
+        generation = cache.get(REDIS_CATALOG_GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    cache.set(REDIS_CATALOG_GENERATION_KEY, uuid4().hex, timeout=None)
+
+
+def invalidate(**kwargs):
+    # Bump now, so this process never serves stale data, and again once
+    # the change is committed, in case another process cached the old
+    # data in between:
+    bump_generation()
+    transaction.on_commit(bump_generation)
+
+
+def connect_signals():
+    for model in CATALOG_MODELS:
+        senders = [model]
+        if hasattr(model, "_parler_meta"):
+            senders += model._parler_meta.get_all_models()
+        for sender in senders:
+            post_save.connect(invalidate, sender=sender)
+            post_delete.connect(invalidate, sender=sender)
+
+
+def visibility_fingerprint(user):
+    """
+    A string that is the same for any two users who can see the same
+    parts of the catalog.
+    """
+    if not user.is_authenticated:
+        return "public"
+    if user.is_superuser:
+        return "all"
+    allowed_list_ids = sorted(user.allowed_list_ids)
+    if not allowed_list_ids:
+        return "public"
+    return ",".join(str(pk) for pk in allowed_list_ids)
+
+
+def response_key(request):
+    parts = (
+        get_generation(),
+        get_language() or "",
+        visibility_fingerprint(request.user),
+        request.build_absolute_uri(),
+    )
+    digest = hashlib.sha1("\n".join(parts).encode()).hexdigest()
+    return REDIS_CATALOG_RESPONSE_KEY.format(digest=digest)
+
+
+def make_etag(data):
+    body = json.dumps(data, cls=JSONEncoder, sort_keys=True)
+    return quote_etag(hashlib.sha1(body.encode()).hexdigest())
+
+
+def cached_response(request, view, *args, **kwargs):
+    """
+    Return the cached response for this request, calling view to make
+    it if there isn't one. Only successful responses are cached.
+    """
+    if settings.CATALOG_CACHE_TIMEOUT <= 0:
+        return view(request, *args, **kwargs)
+
+    key = response_key(request)
+    entry = cache.get(key)
+    if entry is None:
+        response = view(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        entry = {"etag": make_etag(response.data), "data": response.data}
+        cache.set(key, entry, settings.CATALOG_CACHE_TIMEOUT)
+
+    if entry["etag"] in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(entry["data"])
+    response["ETag"] = entry["etag"]
+    return response
+
+
+class CatalogCacheMixin:
+    """
+    Serve a viewset's list and retrieve actions from the catalog cache.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(request, super().retrieve, *args, **kwargs)
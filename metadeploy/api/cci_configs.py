@@ -36,6 +36,11 @@ class MetadeployProjectConfig(BaseProjectConfig):
 class MetaDeployCCI(BaseCumulusCI):
     project_config_class = MetadeployProjectConfig
 
+    def _add_repo_to_path(self):
+        # run_flows makes the repo importable with repo_imports instead,
+        # rather than leaving it on sys.path for every job after this one.
+        pass
+
     def get_flow_from_plan(
         self, plan: Plan, ctx: WorkableModel, skip: List[str] = None
     ):
@@ -5,4 +5,11 @@ SKIP = "skip"
 OPTIONAL = "optional"
 ORGANIZATION_DETAILS = "organization_details"
 REDIS_JOB_CANCEL_KEY = "metadeploy:cancel:{id}"
+REDIS_JOB_LOG_TAIL_KEY = "metadeploy:log_tail:{id}"
 CHANNELS_GROUP_NAME = "{model}.{id}"
+REDIS_ARCHIVE_CACHE_STAT_KEY = "metadeploy:archive_cache:{stat}"
+JOB_DISPATCH_CHANNEL = "metadeploy_job_created"
+REDIS_ORG_ACTIVITY_KEY = "metadeploy:org_activity:{org_key}:{kind}"
+REDIS_PLAN_SUMMARY_KEY = "metadeploy:plan_summary:{generation}:{plan_id}"
+REDIS_CATALOG_GENERATION_KEY = "metadeploy:catalog:generation"
+REDIS_CATALOG_RESPONSE_KEY = "metadeploy:catalog:response:{digest}"
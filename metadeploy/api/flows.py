@@ -1,28 +1,139 @@
 import logging
-from io import StringIO
+from collections import deque
+from contextvars import ContextVar
 
 import bleach
 from cumulusci.core.flowrunner import FlowCallback
+from django.conf import settings
 from django.core.cache import cache
 
 from .belvedere_utils import obscure_salesforce_log
-from .constants import ERROR, OK, OPTIONAL, REDIS_JOB_CANCEL_KEY, SKIP, WARN
+from .constants import (
+    ERROR,
+    OK,
+    OPTIONAL,
+    REDIS_JOB_CANCEL_KEY,
+    REDIS_JOB_LOG_TAIL_KEY,
+    SKIP,
+    WARN,
+)
 
 logger = logging.getLogger(__name__)
+# A running Job's log tail is stored whenever its log is, so this only
+# matters for Jobs whose worker died:
+LOG_TAIL_TIMEOUT = 60 * 60
+
+# The log handler of the flow running in the current thread (or task):
+current_log_handler = ContextVar("current_log_handler", default=None)
 
 
 class StopFlowException(Exception):
     pass
 
 
+class ScrubbingLogHandler(logging.Handler):
+    """
+    Obscure each record as it's emitted, and pass the obscured text on to
+    sink in batches of at least flush_size characters (or whenever flush
+    is called). The last tail_lines lines are kept in tail, for showing
+    what a running job is doing; nothing else is held in memory.
+
+    Each record is obscured on its own, so an ID or org name is only
+    obscured in the records it's recognised in, not wherever else it
+    turns up in the log.
+    """
+
+    def __init__(self, sink, *, flush_size, tail_lines, level=logging.NOTSET):
+        super().__init__(level=level)
+        self.sink = sink
+        self.flush_size = flush_size
+        self.tail = deque(maxlen=tail_lines)
+        self._pending = []
+        self._pending_size = 0
+
+    def emit(self, record):
+        try:
+            text = obscure_salesforce_log(self.format(record)) + "\n"
+        except Exception:  # pragma: nocover
+            self.handleError(record)
+            return
+        self.acquire()
+        try:
+            self.tail.extend(text.splitlines())
+            self._pending.append(text)
+            self._pending_size += len(text)
+            if self._pending_size >= self.flush_size:
+                self._flush()
+        finally:
+            self.release()
+
+    def flush(self):
+        self.acquire()
+        try:
+            self._flush()
+        finally:
+            self.release()
+
+    def _flush(self):
+        if self._pending:
+            text = "".join(self._pending)
+            self._pending = []
+            self._pending_size = 0
+            self.sink(text)
+
+
+class ContextLogHandler(logging.Handler):
+    """
+    Pass each record on to current_log_handler, if there is one.
+
+    One of these is attached to the cumulusci logger for the life of the
+    process, rather than each flow attaching its own handler to that
+    (global) logger, so that flows running at the same time each see only
+    their own records. Records logged from threads a flow starts itself
+    aren't captured, as those threads don't share its context.
+    """
+
+    def emit(self, record):
+        handler = current_log_handler.get()
+        if handler is not None:
+            handler.handle(record)
+
+
+context_log_handler = ContextLogHandler()
+
+
+def install_context_log_handler():
+    logger = logging.getLogger("cumulusci")
+    # addHandler does nothing if the handler is already there:
+    logger.addHandler(context_log_handler)
+    logger.setLevel(logging.DEBUG)
+    return logger
+
+
 class BasicFlowCallback(FlowCallback):
     def __init__(self, ctx):
         self.context = ctx  # will be either a preflight or a job...
+        self._step_ids = None
+
+    def pre_flow(self, coordinator):
+        self._load_step_ids()
+
+    def _load_step_ids(self):
+        """
+        Map each step path in the plan to its step's id, with one query,
+        so that looking up a step per task doesn't cost a query each.
+        """
+        self._step_ids = {}
+        for path, step_id in self.context.plan.steps.values_list("path", "id"):
+            # Steps come back in order, and the first with a path wins:
+            self._step_ids.setdefault(path, str(step_id))
 
     def _get_step_id(self, path):
+        if self._step_ids is None:
+            self._load_step_ids()
         try:
-            return str(self.context.plan.steps.filter(path=path).first().id)
-        except AttributeError:
+            return self._step_ids[path]
+        except KeyError:
             logger.error(f"Unknown task name {path} for {self.context}")
             return None
 
@@ -39,29 +150,42 @@ class BasicFlowCallback(FlowCallback):
 
 class JobFlowCallback(BasicFlowCallback):
     def pre_flow(self, coordinator):
-        logger = logging.getLogger("cumulusci")
-        self.string_buffer = StringIO()
-        self.handler = logging.StreamHandler(stream=self.string_buffer)
+        super().pre_flow(coordinator)
+        self.handler = ScrubbingLogHandler(
+            self._store_log,
+            flush_size=settings.JOB_LOG_FLUSH_SIZE,
+            tail_lines=settings.JOB_LOG_TAIL_LINES,
+        )
         self.handler.setFormatter(logging.Formatter())
-        logger.addHandler(self.handler)
-        logger.setLevel(logging.DEBUG)
-        self.logger = logger
+        self._log_handler_token = current_log_handler.set(self.handler)
+        self.logger = install_context_log_handler()
         return self.logger
 
     def post_flow(self, coordinator):
-        self.logger.removeHandler(self.handler)
+        current_log_handler.reset(self._log_handler_token)
+        self.handler.flush()
+
+    def _store_log(self, text):
+        self.context.append_log(text)
+        # So that JobSerializer can show the log's tail while the Job runs:
+        cache.set(
+            REDIS_JOB_LOG_TAIL_KEY.format(id=self.context.id),
+            "\n".join(self.handler.tail),
+            LOG_TAIL_TIMEOUT,
+        )
 
     def post_task(self, step, result):
         step_id = self._get_step_id(step.path)
         if step_id:
             if result.exception:
-                self.context.results[step_id] = [
+                step_result = [
                     {"status": ERROR, "message": bleach.clean(str(result.exception))}
                 ]
             else:
-                self.context.results[step_id] = [{"status": OK}]
-            self.context.log = obscure_salesforce_log(self.string_buffer.getvalue())
-            self.context.save()
+                step_result = [{"status": OK}]
+            # So the step's log is stored before its result is announced:
+            self.handler.flush()
+            self.context.record_step_result(step_id, step_result)
 
 
 class PreflightFlowCallback(BasicFlowCallback):
@@ -8,19 +8,39 @@ in the same transaction as the data it relies on is written, it may try
 to run before that data is actually visible in the database.
 
 To get around this, we have a single periodic enqueuer job that picks up
-instances of the Job model and triggers the run_flows_job.
+instances of the Job model and queues run_flows for each.
+
+The one exception is prefetch_version, which Version.save schedules
+directly, but only from transaction.on_commit, so the Version is always
+visible by the time it runs. It needs nothing else from the database,
+and missing one is harmless (the first install just fetches the repo
+itself), so it doesn't need the enqueuer's bookkeeping.
+
+So that users don't wait for the enqueuer's next run, saving a new Job
+also sends a Postgres NOTIFY, which is only delivered once the Job is
+committed. A long-running dispatcher LISTENs for these and runs the
+enqueuer straight away; the periodic enqueuer is then just a sweep for
+anything the dispatcher missed.
+
+Each Job is claimed, with the id its RQ job will have, in a committed
+transaction before it is sent to RQ. If the enqueuer dies between the
+two, the claim is released by a later run once the RQ job has failed to
+turn up within JOB_CLAIM_TIMEOUT_SECONDS. run_flows checks that the Job
+is still claimed for the RQ job running it, so if one released that way
+does turn up after all, it does nothing.
 """
 
 import contextlib
 import logging
 import os
+import select
 import shutil
-import sys
 import traceback
+import uuid
 import zipfile
 from datetime import timedelta
-from glob import glob
-from itertools import chain
+from functools import partial
+from io import BytesIO
 
 import github3
 from asgiref.sync import async_to_sync
@@ -28,18 +48,25 @@ from cumulusci.core.config import OrgConfig, ServiceConfig
 from cumulusci.utils import temporary_dir
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import InterfaceError, OperationalError, connection, transaction
 from django.utils import timezone
-from django_rq import job
+from django_rq import get_connection, get_queue, job
+from rq import get_current_job
 from rq.exceptions import ShutDownImminentException
+from rq.job import Job as RQJob
 from rq.worker import StopRequested
 
+from .archive_cache import ArchiveCache
 from .cci_configs import MetaDeployCCI, extract_user_and_repo
+from .constants import JOB_DISPATCH_CHANNEL
 from .flows import StopFlowException
-from .models import Job, PreflightResult
+from .models import Job, PreflightResult, Version
 from .push import report_error
+from .repo_imports import repo_imports
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
+ENQUEUER_BATCH_SIZE = 100
 sync_report_error = async_to_sync(report_error)
 
 
@@ -74,16 +101,6 @@ def report_errors_to(user):
         raise
 
 
-@contextlib.contextmanager
-def prepend_python_path(path):
-    prev_path = sys.path.copy()
-    sys.path.insert(0, path)
-    try:
-        yield
-    finally:
-        sys.path = prev_path
-
-
 @contextlib.contextmanager
 def mark_canceled(result):
     """
@@ -105,30 +122,115 @@ def is_safe_path(path):
     return not os.path.isabs(path) and ".." not in path.split(os.path.sep)
 
 
-def zip_file_is_safe(zip_file):
-    return all(is_safe_path(info.filename) for info in zip_file.infolist())
+def get_github_repo(repo_url):
+    gh = github3.login(token=settings.GITHUB_TOKEN)
+    user, repo_name = extract_user_and_repo(repo_url)
+    return gh.repository(user, repo_name)
 
 
-def run_flows(*, user, plan, skip_tasks, organization_url, result_class, result_id):
+def extract_zip_file(zip_file, path):
+    """
+    Extract zip_file into the directory at path in a single pass.
+
+    GitHub zipballs wrap everything in one root directory named
+    something like ``{owner}-{repo}-{sha}``. We strip that component
+    from each member as we go, so the repo's own files land directly in
+    path.
+
+    Returns False as soon as it finds an unsafe member, or one outside
+    the root directory. Anything extracted before that point is left for
+    the caller to clean up.
+    """
+    root = None
+    made_dirs = {path}
+    for info in zip_file.infolist():
+        if not is_safe_path(info.filename):
+            return False
+        top, _, relative_path = info.filename.partition("/")
+        if root is None:
+            root = top
+        if top != root:
+            return False
+        if not relative_path:
+            continue
+        target = os.path.join(path, relative_path)
+        if info.filename.endswith("/"):
+            target_dir = target
+        else:
+            target_dir = os.path.dirname(target)
+        if target_dir not in made_dirs:
+            os.makedirs(target_dir, exist_ok=True)
+            made_dirs.add(target_dir)
+        if target_dir == target:
+            continue
+        with zip_file.open(info) as src, open(target, "wb") as dest:
+            shutil.copyfileobj(src, dest)
+    return True
+
+
+def extract_zipball(repo, commit_ish, path):
+    """
+    Download the zipball of repo at commit_ish, and extract its contents
+    into the directory at path.
+
+    The archive is held in memory rather than written to disk, and is
+    only read once. Returns False if the zipball is unsafe.
+    """
+    archive = BytesIO()
+    repo.archive("zipball", path=archive, ref=commit_ish)
+    zip_file = zipfile.ZipFile(archive)
+    try:
+        return extract_zip_file(zip_file, path)
+    finally:
+        zip_file.close()
+
+
+def is_current_claim(result):
+    """
+    Whether the RQ job we are running in, if any, is the one that result
+    is claimed for.
+
+    release_lost_claims can't tell an RQ job that was never sent from one
+    whose key has since gone (expired, or purged from the failed queue),
+    so a released Job's old RQ job may still turn up. It must not run
+    the install a second time.
+    """
+    current_job = get_current_job()
+    if current_job is None or not hasattr(result, "job_id"):
+        return True
+    return str(result.job_id) == current_job.id
+
+
+def run_flows(*, result_class, result_id, skip_tasks):
     """
     This operates with side effects; it changes things in a Salesforce
     org, and then records the results of those operations on to a
     `result`.
 
+    Only the result's class and PK go over the wire. Everything else --
+    the user, the plan and the org -- is loaded fresh from the result
+    row, so we never run against stale copies of them.
+
     Args:
-        user (User): The User requesting this flow be run.
-        plan (Plan): The Plan instance for the flow you're running.
+        result_class (Union[Type[Job], Type[PreflightResult]]): The
+            model onto which to record the results of running steps in
+            the flow. Either PreflightResult or Job, as appropriate.
+        result_id (str): the PK of the result instance to get.
         skip_tasks (List[str]): The strings in the list should be valid
             task_name values for steps in this flow.
-        organization_url (str): The URL of the organization, required by
-            the OrgConfig.
-        result_class (Union[Type[Job], Type[PreflightResult]]): The
-            instance onto which to record the results of running steps
-            in the flow. Either a PreflightResult or a Job, as
-            appropriate.
-        result_id (int): the PK of the result instance to get.
     """
-    result = result_class.objects.get(pk=result_id)
+    result = result_class.objects.select_related("user", "plan__version__product").get(
+        pk=result_id
+    )
+    if not is_current_claim(result):
+        logger.warning(
+            f"Not running {result_class.__name__} {result_id}; it has been released "
+            "and is no longer claimed by this RQ job"
+        )
+        return
+    user = result.user
+    plan = result.plan
+    organization_url = result.organization_url
     token, token_secret = user.token
     repo_url = plan.version.product.repo_url
     commit_ish = plan.version.commit_ish
@@ -139,38 +241,33 @@ def run_flows(*, user, plan, skip_tasks, organization_url, result_class, result_
         stack.enter_context(report_errors_to(user))
         tmpdirname = stack.enter_context(temporary_dir())
 
-        # Get cwd into Python path, so that the tasks below can import
-        # from the checked-out repo:
-        stack.enter_context(prepend_python_path(os.path.abspath(tmpdirname)))
-
         # Let's clone the repo locally:
-        gh = github3.login(token=settings.GITHUB_TOKEN)
-        user, repo_name = extract_user_and_repo(repo_url)
-        repo = gh.repository(user, repo_name)
+        repo = get_github_repo(repo_url)
         # Make sure we have the actual owner/repo name if we were redirected
         user = repo.owner.login
         repo_name = repo.name
-        zip_file_name = "archive.zip"
-        repo.archive("zipball", path=zip_file_name, ref=commit_ish)
-        zip_file = zipfile.ZipFile(zip_file_name)
-        if not zip_file_is_safe(zip_file):
+        commit_sha = None
+        archive_cache = ArchiveCache.from_settings()
+        if archive_cache:
+            commit_sha = repo.commit(commit_ish).sha
+            is_safe = archive_cache.checkout(
+                owner=user,
+                repo_name=repo_name,
+                sha=commit_sha,
+                dest=tmpdirname,
+                populate=partial(extract_zipball, repo, commit_sha),
+            )
+        else:
+            is_safe = extract_zipball(repo, commit_ish, tmpdirname)
+        if not is_safe:
             # This is very unlikely, as we get the zipfile from GitHub,
             # but must be considered:
             url = f"https://github.com/{user}/{repo_name}#{commit_ish}"
             logger.error(f"Malformed or malicious zip file from {url}.")
             return
-        zip_file.extractall()
-        # We know that the zipball contains a root directory named
-        # something like this by GitHub's convention. If that ever
-        # breaks, this will break:
-        zipball_root = glob(f"{user}-{repo_name}-*")[0]
-        # It's not unlikely that the zipball root contains a directory
-        # with the same name, so we pre-emptively rename it to probably
-        # avoid collisions:
-        shutil.move(zipball_root, "zipball_root")
-        for path in chain(glob("zipball_root/*"), glob("zipball_root/.*")):
-            shutil.move(path, ".")
-        shutil.rmtree("zipball_root")
+
+        # So that the tasks below can import from the checked-out repo:
+        stack.enter_context(repo_imports(os.path.abspath(tmpdirname)))
 
         # There's a lot of setup to make configs and keychains, link
         # them properly, and then eventually pass them into a flow,
@@ -217,29 +314,146 @@ def run_flows(*, user, plan, skip_tasks, organization_url, result_class, result_
         flow_coordinator.run(ctx.keychain.get_org(current_org))
 
 
-run_flows_job = job(run_flows)
+def claim_pending_jobs(batch_size):
+    """
+    Mark up to batch_size pending Jobs as enqueued, each with the id of
+    the RQ job that will run it, invalidate their related preflights,
+    and return them with the tasks each should skip.
+
+    This takes a fixed number of queries per batch. The rows are locked
+    with SKIP LOCKED, so several enqueuers running at once will each
+    claim a different batch rather than queueing up behind each other.
+    """
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.filter(enqueued_at=None)
+            .order_by("created_at")
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        if not jobs:
+            return []
+        batch = Job.objects.filter(pk__in=[j.pk for j in jobs])
+        batch.invalidate_related_preflights()
+        skip_tasks = batch.skip_tasks_by_job()
+        now = timezone.now()
+        for j in jobs:
+            j.job_id = uuid.uuid4()
+            j.enqueued_at = now
+            j.edited_at = now
+        Job.objects.bulk_update(jobs, ["job_id", "enqueued_at", "edited_at"])
+    return [(j, skip_tasks[j.pk]) for j in jobs]
+
+
+def release_lost_claims():
+    """
+    Return to pending any Job claimed more than JOB_CLAIM_TIMEOUT_SECONDS
+    ago whose RQ job never turned up, because whatever claimed it died
+    before sending it.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_CLAIM_TIMEOUT_SECONDS)
+    claimed = list(
+        Job.objects.filter(status=Job.Status.started, enqueued_at__lt=cutoff)
+        .exclude(job_id=None)
+        .values_list("id", "job_id")
+    )
+    if not claimed:
+        return
+    with get_connection().pipeline() as pipe:
+        for _, job_id in claimed:
+            pipe.exists(RQJob.key_for(str(job_id)))
+        sent = pipe.execute()
+    lost = [pk for (pk, _), was_sent in zip(claimed, sent) if not was_sent]
+    if lost:
+        logger.warning(f"Releasing {len(lost)} claimed Jobs that never reached RQ")
+        Job.objects.filter(pk__in=lost, enqueued_at__lt=cutoff).update(
+            enqueued_at=None, job_id=None
+        )
+
+
+def send_to_queue(j, skip_tasks):
+    get_queue().enqueue_call(
+        run_flows,
+        kwargs={"result_class": Job, "result_id": str(j.id), "skip_tasks": skip_tasks},
+        job_id=str(j.job_id),
+    )
 
 
-def enqueuer():
+def enqueuer(batch_size=ENQUEUER_BATCH_SIZE):
     logger.debug("Enqueuer live", extra={"tag": "jobs.enqueuer"})
-    for j in Job.objects.filter(enqueued_at=None):
-        j.invalidate_related_preflight()
-        rq_job = run_flows_job.delay(
-            user=j.user,
-            plan=j.plan,
-            skip_tasks=j.skip_tasks(),
-            organization_url=j.organization_url,
-            result_class=Job,
-            result_id=j.id,
-        )
-        j.job_id = rq_job.id
-        j.enqueued_at = rq_job.enqueued_at
-        j.save()
+    release_lost_claims()
+    while True:
+        # Jobs are claimed, and committed as claimed, before they go to
+        # RQ. Otherwise a worker could load a Job before the claim
+        # committed, and write its enqueued_at and job_id back to None
+        # when it saves.
+        claimed = claim_pending_jobs(batch_size)
+        if not claimed:
+            return
+        sent = 0
+        try:
+            for j, skip_tasks in claimed:
+                send_to_queue(j, skip_tasks)
+                sent += 1
+        finally:
+            # Anything we claimed but couldn't get to RQ goes back to
+            # pending, for the next run to pick up:
+            unsent = [j.pk for j, _ in claimed[sent:]]
+            if unsent:
+                Job.objects.filter(pk__in=unsent).update(enqueued_at=None, job_id=None)
 
 
 enqueuer_job = job(enqueuer)
 
 
+def wait_for_jobs(timeout):
+    """
+    Block until a Job-creation notification arrives or timeout seconds
+    pass, then drain any notifications received.
+    """
+    pg_connection = connection.connection
+    # psycopg2 collects notifications as a side effect of any query, so
+    # some may already be waiting for us:
+    if not pg_connection.notifies:
+        select.select([pg_connection], [], [], timeout)
+        pg_connection.poll()
+    pg_connection.notifies.clear()
+
+
+def dispatcher(*, timeout=None):
+    """
+    Run the enqueuer whenever a Job is created, or every timeout seconds
+    in case a notification went missing. Runs until interrupted.
+    """
+    if timeout is None:
+        timeout = settings.JOB_DISPATCHER_SWEEP_SECONDS
+    while True:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {JOB_DISPATCH_CHANNEL}")
+            logger.info("Dispatcher listening", extra={"tag": "jobs.dispatcher"})
+            while True:
+                # Enqueue before waiting, to pick up anything created
+                # while we weren't listening:
+                try:
+                    enqueuer()
+                except (InterfaceError, OperationalError):
+                    raise
+                except Exception:
+                    # Most likely Redis is unavailable; whatever wasn't
+                    # enqueued is still pending, for the next try:
+                    logger.exception(
+                        "Dispatcher failed to enqueue Jobs",
+                        extra={"tag": "jobs.dispatcher"},
+                    )
+                wait_for_jobs(timeout)
+        except (InterfaceError, OperationalError):
+            logger.exception(
+                "Dispatcher lost its database connection; reconnecting",
+                extra={"tag": "jobs.dispatcher"},
+            )
+            connection.close()
+
+
 def expire_user_tokens():
     for user in User.objects.with_expired_tokens():
         user.expire_token()
@@ -251,14 +465,8 @@ expire_user_tokens_job = job(expire_user_tokens)
 def preflight(preflight_result_id):
     # Because the FieldTracker interferes with transparently serializing models across
     # the Redis boundary, we have to pass a primitive value to this function,
-    preflight_result = PreflightResult.objects.get(pk=preflight_result_id)
     run_flows(
-        user=preflight_result.user,
-        plan=preflight_result.plan,
-        skip_tasks=[],
-        organization_url=preflight_result.organization_url,
-        result_class=PreflightResult,
-        result_id=preflight_result.id,
+        result_class=PreflightResult, result_id=preflight_result_id, skip_tasks=[]
     )
 
 
@@ -281,3 +489,30 @@ def expire_preflights():
 
 
 expire_preflights_job = job(expire_preflights)
+
+
+def prefetch_version(version_id):
+    """
+    Populate this host's archive cache with the repo for a Version, so
+    the first install of it doesn't have to wait on GitHub.
+    """
+    archive_cache = ArchiveCache.from_settings()
+    if not archive_cache:
+        return
+    version = Version.objects.select_related("product").get(pk=version_id)
+    if not version.product.repo_url:
+        return
+    repo = get_github_repo(version.product.repo_url)
+    commit_sha = repo.commit(version.commit_ish).sha
+    is_safe = archive_cache.checkout(
+        owner=repo.owner.login,
+        repo_name=repo.name,
+        sha=commit_sha,
+        dest=None,
+        populate=partial(extract_zipball, repo, commit_sha),
+    )
+    if not is_safe:
+        logger.error(f"Malformed or malicious zip file for {version}.")
+
+
+prefetch_version_job = job(prefetch_version)
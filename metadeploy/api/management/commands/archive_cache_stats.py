@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from ...archive_cache import ArchiveCache, get_stats, tree_size
+
+
+class Command(BaseCommand):
+    help = "Report hit, miss and eviction counts for the repo archive cache."
+
+    def handle(self, *args, **options):
+        for stat, value in get_stats().items():
+            self.stdout.write(f"{stat}: {value}")
+        archive_cache = ArchiveCache.from_settings()
+        if archive_cache:
+            self.stdout.write(
+                f"size: {tree_size(archive_cache.root)} / {archive_cache.max_size}"
+            )
+        else:
+            self.stdout.write("The archive cache is disabled.")
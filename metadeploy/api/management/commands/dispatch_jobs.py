@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from ...jobs import dispatcher
+
+
+class Command(BaseCommand):
+    help = "Enqueue Jobs as soon as they are created."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=None,
+            help=(
+                "Seconds to wait for a new Job before checking for pending "
+                "Jobs anyway."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        dispatcher(timeout=options["timeout"])
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from ...jobs import prefetch_version
+from ...models import Version
+
+
+class Command(BaseCommand):
+    help = (
+        "Download the repo archive of every listed Version into this host's "
+        "archive cache. Run it before starting a worker to start it warm."
+    )
+
+    def handle(self, *args, **options):
+        versions = Version.objects.filter(is_listed=True).exclude(product__repo_url="")
+        failures = 0
+        for version in versions:
+            try:
+                prefetch_version(version.id)
+            except Exception as e:
+                # One bad repo shouldn't keep a worker from starting:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"{version}: {e}"))
+        if failures:
+            self.stdout.write(self.style.WARNING(f"{failures} prefetch(es) failed."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Prefetched!"))
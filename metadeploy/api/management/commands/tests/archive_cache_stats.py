@@ -0,0 +1,28 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+
+def test_archive_cache_stats__disabled(mocker):
+    mocker.patch(
+        "metadeploy.api.management.commands.archive_cache_stats.get_stats",
+        return_value={"hits": 3, "misses": 1, "evictions": 0},
+    )
+    out = StringIO()
+    call_command("archive_cache_stats", stdout=out)
+
+    assert out.getvalue().splitlines() == [
+        "hits: 3",
+        "misses: 1",
+        "evictions: 0",
+        "The archive cache is disabled.",
+    ]
+
+
+def test_archive_cache_stats__enabled(settings, tmp_path):
+    settings.REPO_ARCHIVE_CACHE_DIR = str(tmp_path)
+    settings.REPO_ARCHIVE_CACHE_MAX_SIZE = 1000
+    out = StringIO()
+    call_command("archive_cache_stats", stdout=out)
+
+    assert out.getvalue().splitlines()[-1] == "size: 0 / 1000"
@@ -0,0 +1,11 @@
+from django.core.management import call_command
+
+
+def test_dispatch_jobs(mocker):
+    dispatcher = mocker.patch(
+        "metadeploy.api.management.commands.dispatch_jobs.dispatcher"
+    )
+
+    call_command("dispatch_jobs", "--timeout", "5")
+
+    dispatcher.assert_called_once_with(timeout=5)
@@ -0,0 +1,35 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_prefetch_archives(mocker, version_factory):
+    prefetch_version = mocker.patch(
+        "metadeploy.api.management.commands.prefetch_archives.prefetch_version"
+    )
+    listed = version_factory()
+    version_factory(is_listed=False)
+    version_factory(product__repo_url="")
+    out = StringIO()
+
+    call_command("prefetch_archives", stdout=out)
+
+    prefetch_version.assert_called_once_with(listed.id)
+    assert "Prefetched!" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_prefetch_archives__failure(mocker, version_factory):
+    mocker.patch(
+        "metadeploy.api.management.commands.prefetch_archives.prefetch_version",
+        side_effect=Exception("Not found"),
+    )
+    version_factory()
+    out = StringIO()
+
+    call_command("prefetch_archives", stdout=out)
+
+    assert "Not found" in out.getvalue()
+    assert "1 prefetch(es) failed." in out.getvalue()
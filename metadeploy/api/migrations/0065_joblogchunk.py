@@ -0,0 +1,37 @@
+# Generated by Django 2.2 on 2026-10-18 02:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("api", "0064_improve_site_profile")]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobLogChunk",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("text", models.TextField()),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="log_chunks",
+                        to="api.Job",
+                    ),
+                ),
+            ],
+            options={"ordering": ("id",)},
+        )
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 2.2 on 2026-10-18 02:58
+
+from django.db import migrations, models
+
+# These tables are large and busy, so build the indexes without locking
+# out writes. CREATE INDEX CONCURRENTLY can't run in a transaction, hence
+# the hand-written SQL and atomic = False.
+INDEXES = [
+    (
+        "job",
+        models.Index(
+            fields=["organization_url"],
+            name="job_started_org_idx",
+            condition=models.Q(status="started"),
+        ),
+        "api_job (organization_url) WHERE status = 'started'",
+    ),
+    (
+        "job",
+        models.Index(
+            fields=["created_at"],
+            name="job_pending_idx",
+            condition=models.Q(enqueued_at__isnull=True),
+        ),
+        "api_job (created_at) WHERE enqueued_at IS NULL",
+    ),
+    (
+        "preflightresult",
+        models.Index(
+            fields=["organization_url"],
+            name="preflight_started_org_idx",
+            condition=models.Q(status="started"),
+        ),
+        "api_preflightresult (organization_url) WHERE status = 'started'",
+    ),
+    (
+        "preflightresult",
+        models.Index(
+            fields=["user", "plan", "-created_at"], name="preflight_user_plan_idx"
+        ),
+        "api_preflightresult (user_id, plan_id, created_at DESC)",
+    ),
+    (
+        "preflightresult",
+        models.Index(
+            fields=["created_at"],
+            name="preflight_expirable_idx",
+            condition=models.Q(status="complete", is_valid=True),
+        ),
+        "api_preflightresult (created_at) "
+        "WHERE status = 'complete' AND is_valid = true",
+    ),
+]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [("api", "0065_joblogchunk")]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index.name} ON {sql}",
+                    reverse_sql=f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}",
+                )
+            ],
+            state_operations=[migrations.AddIndex(model_name=model, index=index)],
+        )
+        for model, index, sql in INDEXES
+    ]
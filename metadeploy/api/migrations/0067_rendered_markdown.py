@@ -0,0 +1,77 @@
+# Generated by Django 2.2 on 2026-10-18 03:06
+
+from django.db import migrations, models
+
+RENDERED_FIELDS = {
+    "ProductTranslation": ("description", "click_through_agreement"),
+    "PlanTemplateTranslation": ("preflight_message", "post_install_message"),
+    "PlanTranslation": (
+        "preflight_message_additional",
+        "post_install_message_additional",
+    ),
+    "SiteProfileTranslation": ("welcome_text", "copyright_notice"),
+}
+
+
+def render_existing(apps, schema_editor):
+    # MarkdownField adds its rendering "_markdown" property even to the
+    # historical models, so there's no app logic to inline here:
+    for model_name, sources in RENDERED_FIELDS.items():
+        model = apps.get_model("api", model_name)
+        for translation in model.objects.all():
+            for source in sources:
+                setattr(
+                    translation,
+                    f"{source}_html",
+                    getattr(translation, f"{source}_markdown"),
+                )
+            translation.save(update_fields=[f"{source}_html" for source in sources])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("api", "0066_status_and_org_indexes")]
+
+    operations = [
+        migrations.AddField(
+            model_name="producttranslation",
+            name="description_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="producttranslation",
+            name="click_through_agreement_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="plantemplatetranslation",
+            name="preflight_message_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="plantemplatetranslation",
+            name="post_install_message_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="plantranslation",
+            name="preflight_message_additional_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="plantranslation",
+            name="post_install_message_additional_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="siteprofiletranslation",
+            name="welcome_text_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="siteprofiletranslation",
+            name="copyright_notice_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 2.2 on 2026-10-18 03:07
+
+from collections import Counter
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def summarize(result, *, optional_steps):
+    statuses = Counter(
+        outcome.get("status")
+        for outcomes in result.results.values()
+        for outcome in outcomes
+    )
+    result.error_count = statuses["error"]
+    result.warning_count = statuses["warn"]
+    if optional_steps:
+        result.optional_step_ids = [
+            str(k)
+            for k, v in result.results.items()
+            if any(outcome.get("status") == "optional" for outcome in v)
+        ]
+
+
+def summarize_existing(apps, schema_editor):
+    for model_name, fields in (
+        ("Job", ["error_count", "warning_count"]),
+        ("PreflightResult", ["error_count", "warning_count", "optional_step_ids"]),
+    ):
+        model = apps.get_model("api", model_name)
+        batch = []
+        for result in model.objects.exclude(results={}).iterator():
+            summarize(result, optional_steps="optional_step_ids" in fields)
+            batch.append(result)
+            if len(batch) >= BATCH_SIZE:
+                model.objects.bulk_update(batch, fields)
+                batch = []
+        model.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("api", "0067_rendered_markdown")]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="error_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="warning_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="preflightresult",
+            name="error_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="preflightresult",
+            name="warning_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="preflightresult",
+            name="optional_step_ids",
+            field=django.contrib.postgres.fields.jsonb.JSONField(
+                blank=True, default=list, editable=False
+            ),
+        ),
+        migrations.RunPython(summarize_existing, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,11 @@
 import itertools
 import logging
+from collections import Counter
 from datetime import timedelta
+from functools import partial
 from typing import Union
 
-from allauth.socialaccount.models import SocialToken
+from allauth.socialaccount.models import SocialAccount, SocialToken
 from asgiref.sync import async_to_sync
 from colorfield.fields import ColorField
 from cumulusci.core.flowrunner import StepSpec
@@ -14,11 +16,14 @@ from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.models import UserManager as BaseUserManager
 from django.contrib.postgres.fields import JSONField
 from django.contrib.sites.models import Site
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.validators import RegexValidator
-from django.db import models
-from django.db.models import Count, F, Func, Q
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Func, OuterRef, Prefetch, Q, Subquery, Value
+from django.db.models.functions import Cast
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from hashid_field import HashidAutoField
@@ -28,8 +33,17 @@ from parler.models import TranslatableModel, TranslatedFields
 from sfdo_template_helpers.crypto import fernet_decrypt
 from sfdo_template_helpers.fields import MarkdownField
 
+from .archive_cache import ArchiveCache
 from .belvedere_utils import convert_to_18
-from .constants import ERROR, OPTIONAL, ORGANIZATION_DETAILS
+from .constants import (
+    ERROR,
+    JOB_DISPATCH_CHANNEL,
+    OPTIONAL,
+    ORGANIZATION_DETAILS,
+    REDIS_JOB_LOG_TAIL_KEY,
+    WARN,
+)
+from .org_activity import record_status_change
 from .push import (
     notify_org_result_changed,
     notify_post_job,
@@ -89,12 +103,9 @@ class AllowedListAccessMixin(models.Model):
     )
 
     def is_visible_to(self, user):
-        return not self.visible_to or (
+        return not self.visible_to_id or (
             user.is_authenticated
-            and (
-                user.is_superuser
-                or self.visible_to.orgs.filter(org_id=user.org_id).exists()
-            )
+            and (user.is_superuser or self.visible_to_id in user.allowed_list_ids)
         )
 
 
@@ -108,17 +119,55 @@ class UserQuerySet(models.QuerySet):
             | Q(preflightresult__status=PreflightResult.Status.started)
         )
 
+    def with_social_account(self):
+        """
+        Load each user's social account and token along with it, so
+        the org and token properties don't need queries of their own.
+        """
+        return self.prefetch_related(
+            Prefetch(
+                "socialaccount_set",
+                queryset=SocialAccount.objects.order_by("id").prefetch_related(
+                    Prefetch(
+                        "socialtoken_set", queryset=SocialToken.objects.order_by("id")
+                    )
+                ),
+            )
+        )
+
 
 class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     pass
 
 
+def first_related(instance, name):
+    """
+    The first object of a reverse relation, taken from the prefetch
+    cache if the instance was loaded with one.
+    """
+    if name in getattr(instance, "_prefetched_objects_cache", {}):
+        return next(iter(getattr(instance, name).all()), None)
+    return getattr(instance, name).first()
+
+
 class User(HashIdMixin, AbstractUser):
     objects = UserManager()
 
+    # Cached properties that are derived from the social account:
+    SOCIAL_CACHED_PROPERTIES = ("social_account", "token", "allowed_list_ids")
+
     def subscribable_by(self, user):
         return self == user
 
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.clear_social_cache()
+
+    def clear_social_cache(self):
+        for name in self.SOCIAL_CACHED_PROPERTIES:
+            self.__dict__.pop(name, None)
+        getattr(self, "_prefetched_objects_cache", {}).pop("socialaccount_set", None)
+
     def _get_org_property(self, key):
         try:
             return self.social_account.extra_data[ORGANIZATION_DETAILS][key]
@@ -129,6 +178,24 @@ class User(HashIdMixin, AbstractUser):
     def org_id(self):
         return self._get_org_property("Id")
 
+    @cached_property
+    def allowed_list_ids(self):
+        """
+        The IDs of every AllowedList that includes this user's org.
+
+        This is cached on the instance; request.user is loaded afresh
+        for each request, so visibility checks cost one query per
+        request however many objects are checked.
+        """
+        org_id = self.org_id
+        if not org_id:
+            return frozenset()
+        return frozenset(
+            AllowedListOrg.objects.filter(org_id=org_id).values_list(
+                "allowed_list_id", flat=True
+            )
+        )
+
     @property
     def org_name(self):
         return self._get_org_property("Name")
@@ -144,17 +211,17 @@ class User(HashIdMixin, AbstractUser):
         except (AttributeError, KeyError):
             return None
 
-    @property
+    @cached_property
     def token(self):
         account = self.social_account
-        if account and account.socialtoken_set.exists():
-            token = self.social_account.socialtoken_set.first()
+        token = account and first_related(account, "socialtoken_set")
+        if token:
             return (fernet_decrypt(token.token), fernet_decrypt(token.token_secret))
         return (None, None)
 
-    @property
+    @cached_property
     def social_account(self):
-        return self.socialaccount_set.first()
+        return first_related(self, "socialaccount_set")
 
     @property
     def valid_token_for(self):
@@ -164,10 +231,31 @@ class User(HashIdMixin, AbstractUser):
 
     def expire_token(self):
         count, _ = SocialToken.objects.filter(account__user=self).delete()
+        self.clear_social_cache()
         if count:
             async_to_sync(user_token_expired)(self)
 
 
+class RenderedMarkdownMixin:
+    """
+    Store the rendered HTML of each translated MarkdownField in its
+    "<name>_html" field when a translation is created or changed, so
+    that reading it back is a plain attribute access.
+    """
+
+    def save_translation(self, translation, *args, **kwargs):
+        if translation.pk is None or translation.is_modified:
+            for field in translation._meta.fields:
+                if field.name.endswith("_html"):
+                    source = field.name[: -len("_html")]
+                    setattr(
+                        translation,
+                        field.name,
+                        getattr(translation, f"{source}_markdown"),
+                    )
+        super().save_translation(translation, *args, **kwargs)
+
+
 class SlugMixin:
     """
     Please provide:
@@ -191,6 +279,9 @@ class SlugMixin:
 
     @property
     def slug(self):
+        # Querysets that list many objects annotate this up front:
+        if hasattr(self, "active_slug"):
+            return self.active_slug
         slug = self.slug_queryset.filter(is_active=True).first()
         if slug:
             return slug.slug
@@ -252,8 +343,64 @@ class ProductQuerySet(TranslatableQuerySet):
             version__count__gte=1
         )
 
+    def with_related(self):
+        """
+        Fetch everything ProductSerializer needs in a fixed number of
+        queries, however many products there are.
+        """
+        most_recent_version = (
+            Version.objects.filter(product=OuterRef("product"), is_listed=True)
+            .order_by("-created_at")
+            .values("id")[:1]
+        )
+        plans = (
+            Plan.objects.annotate(
+                active_slug=Subquery(
+                    PlanSlug.objects.filter(
+                        parent=OuterRef("plan_template"), is_active=True
+                    )
+                    .order_by("-created_at")
+                    .values("slug")[:1]
+                )
+            )
+            .select_related("visible_to", "plan_template")
+            .prefetch_related(
+                "translations",
+                "plan_template__translations",
+                Prefetch(
+                    "steps", queryset=Step.objects.prefetch_related("translations")
+                ),
+            )
+            .order_by("id")
+        )
+        versions = Version.objects.filter(
+            id=Subquery(most_recent_version)
+        ).prefetch_related("translations", Prefetch("plan_set", queryset=plans))
+        return (
+            self.annotate(
+                active_slug=Subquery(
+                    ProductSlug.objects.filter(parent=OuterRef("pk"), is_active=True)
+                    .order_by("-created_at")
+                    .values("slug")[:1]
+                )
+            )
+            .select_related("category", "visible_to")
+            .prefetch_related(
+                "translations",
+                Prefetch(
+                    "version_set", queryset=versions, to_attr="most_recent_versions"
+                ),
+            )
+        )
+
 
-class Product(HashIdMixin, SlugMixin, AllowedListAccessMixin, TranslatableModel):
+class Product(
+    HashIdMixin,
+    SlugMixin,
+    AllowedListAccessMixin,
+    RenderedMarkdownMixin,
+    TranslatableModel,
+):
     SLDS_ICON_CHOICES = (
         ("", ""),
         ("action", "action"),
@@ -272,16 +419,18 @@ class Product(HashIdMixin, SlugMixin, AllowedListAccessMixin, TranslatableModel)
         title=models.CharField(max_length=256),
         short_description=models.TextField(blank=True),
         description=MarkdownField(property_suffix="_markdown", blank=True),
+        description_html=models.TextField(blank=True, editable=False),
         click_through_agreement=MarkdownField(blank=True, property_suffix="_markdown"),
+        click_through_agreement_html=models.TextField(blank=True, editable=False),
     )
 
     @property
     def description_markdown(self):
-        return self.get_translation("en-us").description_markdown
+        return self.get_translation("en-us").description_html
 
     @property
     def click_through_agreement_markdown(self):
-        return self.get_translation("en-us").click_through_agreement_markdown
+        return self.get_translation("en-us").click_through_agreement_html
 
     category = models.ForeignKey(ProductCategory, on_delete=models.PROTECT)
     color = ColorField(blank=True)
@@ -309,6 +458,8 @@ class Product(HashIdMixin, SlugMixin, AllowedListAccessMixin, TranslatableModel)
 
     @property
     def most_recent_version(self):
+        if hasattr(self, "most_recent_versions"):
+            return next(iter(self.most_recent_versions), None)
         return self.version_set.exclude(is_listed=False).order_by("-created_at").first()
 
     @property
@@ -332,6 +483,8 @@ class VersionQuerySet(TranslatableQuerySet):
 class Version(HashIdMixin, TranslatableModel):
     objects = VersionQuerySet.as_manager()
 
+    tracker = FieldTracker(fields=("commit_ish",))
+
     translations = TranslatedFields(description=models.TextField(blank=True))
 
     product = models.ForeignKey(Product, on_delete=models.PROTECT)
@@ -356,8 +509,40 @@ class Version(HashIdMixin, TranslatableModel):
     def __str__(self):
         return "{}, Version {}".format(self.product, self.label)
 
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        ret = super().save(*args, **kwargs)
+        if is_new or self.tracker.has_changed("commit_ish"):
+            self.prefetch_archive()
+        return ret
+
+    def prefetch_archive(self):
+        """
+        Queue a job to fetch this Version's repo into the archive cache.
+
+        The archive cache is on each host's own disk, so this only warms
+        the cache of whichever worker host runs the job; installs on
+        other hosts still fetch the repo themselves the first time.
+        """
+        # Imported here to avoid a circular import:
+        from .jobs import prefetch_version_job
+
+        if ArchiveCache.from_settings() is None:
+            return
+        # As with Jobs, wait until this row is visible to the worker:
+        version_id = str(self.id)
+        transaction.on_commit(lambda: prefetch_version_job.delay(version_id))
+
+    def _prefetched_plans(self, tier):
+        if "plan_set" not in getattr(self, "_prefetched_objects_cache", {}):
+            return None
+        return [plan for plan in self.plan_set.all() if plan.tier == tier]
+
     @property
     def primary_plan(self):
+        plans = self._prefetched_plans(Plan.Tier.primary)
+        if plans is not None:
+            return next(iter(plans), None)
         try:
             return self.plan_set.filter(tier=Plan.Tier.primary).get()
         except ObjectDoesNotExist:
@@ -365,10 +550,16 @@ class Version(HashIdMixin, TranslatableModel):
 
     @property
     def secondary_plan(self):
+        plans = self._prefetched_plans(Plan.Tier.secondary)
+        if plans is not None:
+            return next(iter(plans), None)
         return self.plan_set.filter(tier=Plan.Tier.secondary).first()
 
     @property
     def additional_plans(self):
+        plans = self._prefetched_plans(Plan.Tier.additional)
+        if plans is not None:
+            return plans
         return self.plan_set.filter(tier=Plan.Tier.additional).order_by("id")
 
 
@@ -410,11 +601,13 @@ class PlanSlug(models.Model):
         return self.slug
 
 
-class PlanTemplate(SlugMixin, TranslatableModel):
+class PlanTemplate(SlugMixin, RenderedMarkdownMixin, TranslatableModel):
     name = models.CharField(max_length=100, blank=True)
     translations = TranslatedFields(
         preflight_message=MarkdownField(blank=True, property_suffix="_markdown"),
+        preflight_message_html=models.TextField(blank=True, editable=False),
         post_install_message=MarkdownField(blank=True, property_suffix="_markdown"),
+        post_install_message_html=models.TextField(blank=True, editable=False),
     )
     product = models.ForeignKey(Product, on_delete=models.PROTECT)
 
@@ -422,17 +615,23 @@ class PlanTemplate(SlugMixin, TranslatableModel):
 
     @property
     def preflight_message_markdown(self):
-        return self.get_translation("en-us").preflight_message_markdown
+        return self.get_translation("en-us").preflight_message_html
 
     @property
     def post_install_message_markdown(self):
-        return self.get_translation("en-us").post_install_message_markdown
+        return self.get_translation("en-us").post_install_message_html
 
     def __str__(self):
         return f"{self.product.title}: {self.name}"
 
 
-class Plan(HashIdMixin, SlugMixin, AllowedListAccessMixin, TranslatableModel):
+class Plan(
+    HashIdMixin,
+    SlugMixin,
+    AllowedListAccessMixin,
+    RenderedMarkdownMixin,
+    TranslatableModel,
+):
     Tier = Choices("primary", "secondary", "additional")
 
     translations = TranslatedFields(
@@ -440,9 +639,13 @@ class Plan(HashIdMixin, SlugMixin, AllowedListAccessMixin, TranslatableModel):
         preflight_message_additional=MarkdownField(
             blank=True, property_suffix="_markdown"
         ),
+        preflight_message_additional_html=models.TextField(blank=True, editable=False),
         post_install_message_additional=MarkdownField(
             blank=True, property_suffix="_markdown"
         ),
+        post_install_message_additional_html=models.TextField(
+            blank=True, editable=False
+        ),
     )
 
     plan_template = models.ForeignKey(PlanTemplate, on_delete=models.PROTECT)
@@ -455,11 +658,11 @@ class Plan(HashIdMixin, SlugMixin, AllowedListAccessMixin, TranslatableModel):
 
     @property
     def preflight_message_additional_markdown(self):
-        return self.get_translation("en-us").preflight_message_additional_markdown
+        return self.get_translation("en-us").preflight_message_additional_html
 
     @property
     def post_install_message_additional_markdown(self):
-        return self.get_translation("en-us").post_install_message_additional_markdown
+        return self.get_translation("en-us").post_install_message_additional_html
 
     @property
     def required_step_ids(self):
@@ -548,14 +751,102 @@ class Step(HashIdMixin, TranslatableModel):
         return f"Step {self.name} of {self.plan.title} ({self.step_num})"
 
 
+class JSONBMerge(Func):
+    """ Merges a dict into a jsonb column in the database.
+
+    Top-level keys in the dict replace those already in the column."""
+
+    arg_joiner = " || "
+    template = "(%(expressions)s)"
+
+    def __init__(self, expression, value, **extra):
+        value = Cast(Value(value, output_field=JSONField()), JSONField())
+        super().__init__(expression, value, output_field=JSONField(), **extra)
+
+
 class ClickThroughAgreement(models.Model):
     text = models.TextField()
 
 
-class Job(HashIdMixin, models.Model):
+class ResultSummaryMixin(models.Model):
+    """
+    Counts of the outcomes in results, recomputed whenever results is
+    written, so that reading them never walks results again.
+    """
+
+    class Meta:
+        abstract = True
+
+    error_count = models.PositiveIntegerField(default=0, editable=False)
+    warning_count = models.PositiveIntegerField(default=0, editable=False)
+
+    def update_result_summary(self):
+        statuses = Counter(
+            outcome.get("status")
+            for outcomes in self.results.values()
+            for outcome in outcomes
+        )
+        self.error_count = statuses[ERROR]
+        self.warning_count = statuses[WARN]
+
+
+class JobQuerySet(models.QuerySet):
+    def skip_tasks_by_job(self):
+        """
+        Map each Job's id to the paths of the steps in its Plan that the
+        user didn't choose to run. This takes a fixed number of queries
+        however many Jobs are in the queryset.
+        """
+        jobs = {}
+        selected = set()
+        for job_id, plan_id, step_id in self.values_list("id", "plan_id", "steps"):
+            jobs[job_id] = plan_id
+            selected.add((job_id, step_id))
+        plan_steps = {}
+        for plan_id, step_id, path in Step.objects.filter(
+            plan_id__in=set(jobs.values())
+        ).values_list("plan_id", "id", "path"):
+            plan_steps.setdefault(plan_id, []).append((step_id, path))
+        return {
+            job_id: [
+                path
+                for step_id, path in plan_steps.get(plan_id, [])
+                if (job_id, step_id) not in selected
+            ]
+            for job_id, plan_id in jobs.items()
+        }
+
+    def invalidate_related_preflights(self):
+        """
+        Invalidate every valid preflight for the same org, user and plan
+        as any Job in the queryset, with a single UPDATE.
+
+        The UPDATE skips PreflightResult.save, so each preflight sends
+        the notifications that save would have once the transaction
+        commits.
+        """
+        related = Q(pk__in=[])
+        for organization_url, user_id, plan_id in self.values_list(
+            "organization_url", "user_id", "plan_id"
+        ):
+            related |= Q(
+                organization_url=organization_url, user_id=user_id, plan_id=plan_id
+            )
+        preflights = list(PreflightResult.objects.filter(related, is_valid=True))
+        PreflightResult.objects.filter(
+            pk__in=[preflight.pk for preflight in preflights]
+        ).update(is_valid=False, edited_at=timezone.now())
+        for preflight in preflights:
+            preflight.is_valid = False
+            transaction.on_commit(partial(preflight.notify_changes, is_new=False))
+
+
+class Job(HashIdMixin, ResultSummaryMixin, models.Model):
     Status = Choices("started", "complete", "failed", "canceled")
     tracker = FieldTracker(fields=("results", "status"))
 
+    objects = JobQuerySet.as_manager()
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
     plan = models.ForeignKey(Plan, on_delete=models.PROTECT)
     steps = models.ManyToManyField(Step)
@@ -583,13 +874,27 @@ class Job(HashIdMixin, models.Model):
         ClickThroughAgreement, on_delete=models.PROTECT, null=True
     )
 
+    class Meta:
+        indexes = [
+            # The running Job for an org:
+            models.Index(
+                fields=["organization_url"],
+                name="job_started_org_idx",
+                condition=Q(status="started"),
+            ),
+            # Jobs waiting for the enqueuer, oldest first:
+            models.Index(
+                fields=["created_at"],
+                name="job_pending_idx",
+                condition=Q(enqueued_at__isnull=True),
+            ),
+        ]
+
     def subscribable_by(self, user):
         return self.is_public or user.is_staff or user == self.user
 
     def skip_tasks(self):
-        return [
-            step.path for step in set(self.plan.steps.all()) - set(self.steps.all())
-        ]
+        return Job.objects.filter(pk=self.pk).skip_tasks_by_job()[self.pk]
 
     def _push_if_condition(self, condition, fn):
         if condition:
@@ -618,9 +923,16 @@ class Job(HashIdMixin, models.Model):
                 text=self.plan.version.product.click_through_agreement
             )
             self.click_through_agreement = ctt
+        if is_new or self.tracker.has_changed("results"):
+            self.update_result_summary()
 
         ret = super().save(*args, **kwargs)
 
+        if is_new:
+            self.notify_dispatcher()
+        if is_new or self.tracker.has_changed("status"):
+            record_status_change(self)
+
         try:
             self.push_to_org_subscribers(is_new)
             self.push_if_results_changed()
@@ -631,19 +943,72 @@ class Job(HashIdMixin, models.Model):
         return ret
 
     def invalidate_related_preflight(self):
-        # We expect this to be a list of 1 or 0, but we want to account
-        # for the possibility of a larger set. We don't use .update
-        # because we want to trigger the logic in the preflight's save
-        # method.
-        preflights = PreflightResult.objects.filter(
-            organization_url=self.organization_url,
-            user=self.user,
-            plan=self.plan,
-            is_valid=True,
+        Job.objects.filter(pk=self.pk).invalidate_related_preflights()
+
+    def record_step_result(self, step_id, step_result):
+        """
+        Record the result of a single step and push TASK_COMPLETED.
+
+        This is much cheaper than a save: it merges just this step's key
+        into results in the database, leaving every other column alone,
+        and skips the checks that save runs for each push.
+        """
+        self.results[step_id] = step_result
+        self.update_result_summary()
+        Job.objects.filter(pk=self.pk).update(
+            results=JSONBMerge(F("results"), {step_id: step_result}),
+            error_count=self.error_count,
+            warning_count=self.warning_count,
         )
-        for preflight in preflights:
-            preflight.is_valid = False
-            preflight.save()
+        # So that the next save doesn't see results as changed and push
+        # TASK_COMPLETED again:
+        self.tracker.set_saved_fields(fields=["results"])
+        try:
+            async_to_sync(notify_post_task)(self)
+        except RuntimeError as error:
+            logger.warn(f"RuntimeError: {error}")
+
+    def append_log(self, text):
+        if text:
+            JobLogChunk.objects.create(job=self, text=text)
+
+    @property
+    def full_log(self):
+        # Jobs run before logs were stored in chunks have theirs in log:
+        return self.log + "".join(self.log_chunks.values_list("text", flat=True))
+
+    @property
+    def log_tail(self):
+        """
+        The last JOB_LOG_TAIL_LINES lines of this Job's log, as of its
+        last flush, if it is running.
+        """
+        return cache.get(REDIS_JOB_LOG_TAIL_KEY.format(id=self.id), "")
+
+    def notify_dispatcher(self):
+        # Postgres holds the notification until the surrounding
+        # transaction commits, so the dispatcher never hears about a Job
+        # it can't yet see:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, %s)", [JOB_DISPATCH_CHANNEL, str(self.id)]
+            )
+
+
+class JobLogChunk(models.Model):
+    """
+    Part of the log output of a Job, already obscured. A chunk is stored
+    whenever JOB_LOG_FLUSH_SIZE characters have built up, and at the end
+    of each step, so the cost of saving some log is independent of how
+    much log came before it.
+    """
+
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="log_chunks")
+    created_at = models.DateTimeField(auto_now_add=True)
+    text = models.TextField()
+
+    class Meta:
+        ordering = ("id",)
 
 
 class PreflightResultQuerySet(models.QuerySet):
@@ -654,10 +1019,10 @@ class PreflightResultQuerySet(models.QuerySet):
         return self.filter(**kwargs).order_by("-created_at").first()
 
 
-class PreflightResult(models.Model):
+class PreflightResult(ResultSummaryMixin, models.Model):
     Status = Choices("started", "complete", "failed", "canceled")
 
-    tracker = FieldTracker(fields=("status", "is_valid"))
+    tracker = FieldTracker(fields=("results", "status", "is_valid"))
 
     objects = PreflightResultQuerySet.as_manager()
 
@@ -676,29 +1041,45 @@ class PreflightResult(models.Model):
         ),
     )
     # Maybe we don't use foreign keys here because we want the result to
-    # remain static even if steps are subsequently changed:
-    results = JSONField(default=dict, blank=True)
-    exception = models.TextField(null=True)
-    # It should take the shape of:
+    # remain static even if steps are subsequently changed. It should take
+    # the shape of:
     # {
     #   <definitive name>: [... errors],
     #   ...
     # }
+    results = JSONField(default=dict, blank=True)
+    exception = models.TextField(null=True)
+    # The PKs of the steps in results that preflight marked optional,
+    # which update_result_summary keeps up to date:
+    optional_step_ids = JSONField(default=list, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # The running preflight for an org:
+            models.Index(
+                fields=["organization_url"],
+                name="preflight_started_org_idx",
+                condition=Q(status="started"),
+            ),
+            # PreflightResult.objects.most_recent:
+            models.Index(
+                fields=["user", "plan", "-created_at"], name="preflight_user_plan_idx"
+            ),
+            # Preflights for expire_preflights to consider:
+            models.Index(
+                fields=["created_at"],
+                name="preflight_expirable_idx",
+                condition=Q(status="complete", is_valid=True),
+            ),
+        ]
 
     def subscribable_by(self, user):
         return self.user == user
 
     def has_any_errors(self):
-        return any(
-            (
-                val
-                for val in itertools.chain(*self.results.values())
-                if val.get("status", None) == ERROR
-            )
-        )
+        return self.error_count > 0
 
-    @property
-    def optional_step_ids(self):
+    def update_result_summary(self):
         """
         self.results is a dict mapping a unique identifier for a step to
         a list of errors, warnings, and other outcomes of preflighting
@@ -707,12 +1088,13 @@ class PreflightResult(models.Model):
         it. However, currently, this is most convenient for the
         frontend. This key is set by PreflightFlow._get_step_id.
 
-        So this will return a list of step PKs, for now.
+        So optional_step_ids is a list of step PKs, for now.
         """
-        return [
+        super().update_result_summary()
+        self.optional_step_ids = [
             str(k)
             for k, v in self.results.items()
-            if any([status["status"] == OPTIONAL for status in v])
+            if any(status.get("status") == OPTIONAL for status in v)
         ]
 
     def _push_if_condition(self, condition, fn):
@@ -751,7 +1133,15 @@ class PreflightResult(models.Model):
 
     def save(self, *args, **kwargs):
         is_new = self._state.adding
+        if is_new or self.tracker.has_changed("results"):
+            self.update_result_summary()
         ret = super().save(*args, **kwargs)
+        self.notify_changes(is_new)
+        return ret
+
+    def notify_changes(self, is_new):
+        if is_new or self.tracker.has_changed("status"):
+            record_status_change(self)
 
         try:
             self.push_to_org_subscribers(is_new)
@@ -762,17 +1152,17 @@ class PreflightResult(models.Model):
         except RuntimeError as error:
             logger.warn(f"RuntimeError: {error}")
 
-        return ret
-
 
-class SiteProfile(TranslatableModel):
+class SiteProfile(RenderedMarkdownMixin, TranslatableModel):
     site = models.OneToOneField(Site, on_delete=models.CASCADE)
 
     translations = TranslatedFields(
         name=models.CharField(max_length=64),
         company_name=models.CharField(max_length=64, blank=True),
         welcome_text=MarkdownField(property_suffix="_markdown", blank=True),
+        welcome_text_html=models.TextField(blank=True, editable=False),
         copyright_notice=MarkdownField(property_suffix="_markdown", blank=True),
+        copyright_notice_html=models.TextField(blank=True, editable=False),
     )
 
     product_logo = models.ImageField(blank=True)
@@ -781,11 +1171,11 @@ class SiteProfile(TranslatableModel):
 
     @property
     def welcome_text_markdown(self):
-        return self.get_translation("en-us").welcome_text_markdown
+        return self.get_translation("en-us").welcome_text_html
 
     @property
     def copyright_notice_markdown(self):
-        return self.get_translation("en-us").copyright_notice_markdown
+        return self.get_translation("en-us").copyright_notice_html
 
     def __str__(self):
         return self.name
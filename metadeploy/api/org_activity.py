@@ -0,0 +1,144 @@
+"""
+An index of what's currently running against each org.
+
+The org notifications and the org endpoint both need the Job and the
+PreflightResult, if any, currently started for an org. Rather than query
+for those every time, we keep their serialized summaries in the cache,
+updated whenever a Job or PreflightResult starts or stops. On a miss we
+fall back to the database and populate the index from that.
+
+Each entry is stamped with a version token that every status change
+replaces, once it's committed. An entry whose stamp isn't the current
+token is ignored, so a reader that went to the database just before a
+change can't store what it read over the top of it. A stopped result
+just replaces the token, so if two results were somehow running against
+one org, the next read finds the other from the database.
+"""
+
+from functools import partial
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .constants import REDIS_ORG_ACTIVITY_KEY, REDIS_PLAN_SUMMARY_KEY
+from .hash_url import convert_org_url_to_key
+
+# Entries expire, so anything that slips through (a rolled-back save,
+# say) is only stale for a while:
+ORG_ACTIVITY_TIMEOUT = 60
+# Plan summaries only change when the catalog does, which changes their
+# keys, so they can be kept for longer:
+PLAN_SUMMARY_TIMEOUT = 60 * 60
+KINDS = {"job": "current_job", "preflightresult": "current_preflight"}
+
+
+def _key(org_url, kind):
+    return REDIS_ORG_ACTIVITY_KEY.format(
+        org_key=convert_org_url_to_key(org_url), kind=kind
+    )
+
+
+def _version_key(org_url, kind):
+    return _key(org_url, f"{kind}:version")
+
+
+def _from_db(org_url):
+    from .models import Job, PreflightResult
+    from .serializers import OrgSerializer
+
+    current_job = Job.objects.filter(
+        organization_url=org_url, status=Job.Status.started
+    ).first()
+    current_preflight = PreflightResult.objects.filter(
+        organization_url=org_url, status=PreflightResult.Status.started
+    ).first()
+    return OrgSerializer(
+        {"current_job": current_job, "current_preflight": current_preflight}
+    ).data
+
+
+def get_org_activity(org_url):
+    """
+    Return what's running against org_url, as serialized by
+    OrgSerializer.
+    """
+    keys = {kind: _key(org_url, kind) for kind in KINDS}
+    version_keys = {kind: _version_key(org_url, kind) for kind in KINDS}
+    cached = cache.get_many([*keys.values(), *version_keys.values()])
+    versions = {kind: cached.get(version_keys[kind]) for kind in KINDS}
+    entries = {kind: cached.get(keys[kind]) for kind in KINDS}
+    if all(
+        versions[kind] is not None
+        and entries[kind] is not None
+        and entries[kind]["version"] == versions[kind]
+        for kind in KINDS
+    ):
+        return {field: entries[kind]["value"] for kind, field in KINDS.items()}
+
+    for kind in KINDS:
+        if versions[kind] is None:
+            versions[kind] = uuid4().hex
+            cache.set(version_keys[kind], versions[kind], ORG_ACTIVITY_TIMEOUT)
+    data = _from_db(org_url)
+    cache.set_many(
+        {
+            keys[kind]: {"version": versions[kind], "value": data[field]}
+            for kind, field in KINDS.items()
+        },
+        ORG_ACTIVITY_TIMEOUT,
+    )
+    return data
+
+
+def _plan_summary(job):
+    """
+    The parts of a Job's JobSummarySerializer data that are the same for
+    every Job of its Plan.
+    """
+    from .catalog_cache import get_generation
+    from .serializers import JobSummarySerializer
+
+    key = REDIS_PLAN_SUMMARY_KEY.format(
+        generation=get_generation(), plan_id=job.plan_id
+    )
+    summary = cache.get(key)
+    if summary is None:
+        summary = dict(JobSummarySerializer(job).data)
+        del summary["id"]
+        cache.set(key, summary, PLAN_SUMMARY_TIMEOUT)
+    return summary
+
+
+def _summarize(result):
+    # As OrgSerializer would, but from the Job's own fields and its Plan's
+    # cached summary, rather than loading the Plan's slugs every time:
+    if result._meta.model_name == "job":
+        return {"id": str(result.id), **_plan_summary(result)}
+    return str(result.id)
+
+
+def _record(org_url, kind, value=None):
+    version = uuid4().hex
+    if value is None:
+        cache.set(_version_key(org_url, kind), version, ORG_ACTIVITY_TIMEOUT)
+        return
+    cache.set_many(
+        {
+            _version_key(org_url, kind): version,
+            _key(org_url, kind): {"version": version, "value": value},
+        },
+        ORG_ACTIVITY_TIMEOUT,
+    )
+
+
+def record_status_change(result):
+    """
+    Update the index for a Job or PreflightResult that has just been
+    created or changed status, once the change is committed.
+    """
+    kind = result._meta.model_name
+    value = None
+    if result.status == result.Status.started:
+        value = _summarize(result)
+    transaction.on_commit(partial(_record, result.organization_url, kind, value))
@@ -16,8 +16,22 @@ Websocket notifications you can subscribe to:
         JOB_CANCELED
     org.:org_url
         ORG_CHANGED
+
+Progress events (TASK_COMPLETED) for the same instance are coalesced:
+after one is sent, any more that arrive within PUSH_COALESCE_WINDOW_MS
+are merged, and only the latest is sent once the window closes. Since
+subscribers re-fetch the instance when notified, nothing is lost.
+Terminal events are always sent straight away.
 """
+import logging
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
 from .constants import CHANNELS_GROUP_NAME
@@ -34,21 +48,111 @@ async def push_message_about_instance(instance, json_message):
     )
 
 
+logger = logging.getLogger(__name__)
+
+TERMINAL_TYPES = {"JOB_COMPLETED", "JOB_FAILED", "JOB_CANCELED"}
+
+PendingEvent = namedtuple("PendingEvent", "event merged timer")
+
+
+def send_event(group_name, event):
+    async_to_sync(get_channel_layer().group_send)(group_name, event)
+
+
+class Coalescer:
+    """
+    Holds back events for a group that arrive too soon after the last
+    one sent to it, keeping only the latest, and sends that when the
+    window closes.
+
+    Each event sent carries a "merged" count of the events it replaced.
+    """
+
+    # Forget when we last sent to groups once we're tracking this many:
+    MAX_TRACKED_GROUPS = 1000
+
+    def __init__(self, send=send_event):
+        self.send = send
+        self._lock = threading.Lock()
+        self._last_sent = {}
+        self._pending = {}
+
+    @property
+    def window(self):
+        return settings.PUSH_COALESCE_WINDOW_MS / 1000
+
+    def offer(self, group_name, event, *, flush=False):
+        """
+        Return True if event should be sent now. Otherwise hold on to it,
+        to be sent when the window closes, and return False.
+        """
+        now = time.monotonic()
+        with self._lock:
+            merged = 0
+            pending = self._pending.pop(group_name, None)
+            if pending:
+                pending.timer.cancel()
+                merged = pending.merged + 1
+            last_sent = self._last_sent.get(group_name)
+            wait = 0 if last_sent is None else last_sent + self.window - now
+            if flush or wait <= 0:
+                self._mark_sent(group_name, now, forget=flush)
+                self._finalize(event, merged)
+                return True
+            timer = threading.Timer(wait, self.flush, args=[group_name])
+            timer.daemon = True
+            self._pending[group_name] = PendingEvent(event, merged, timer)
+            timer.start()
+            return False
+
+    def flush(self, group_name):
+        with self._lock:
+            pending = self._pending.pop(group_name, None)
+            if pending is None:
+                return
+            self._mark_sent(group_name, time.monotonic())
+        self._finalize(pending.event, pending.merged)
+        self.send(group_name, pending.event)
+
+    def _mark_sent(self, group_name, now, *, forget=False):
+        if forget:
+            self._last_sent.pop(group_name, None)
+            return
+        if len(self._last_sent) >= self.MAX_TRACKED_GROUPS:
+            self._last_sent = {
+                name: sent
+                for name, sent in self._last_sent.items()
+                if sent + self.window > now
+            }
+        self._last_sent[group_name] = now
+
+    def _finalize(self, event, merged):
+        event["merged"] = merged
+        if merged:
+            logger.debug(f"Merged {merged} {event['inner_type']} event(s).")
+
+
+coalescer = Coalescer()
+
+
 async def push_serializable(instance, serializer, type_):
     model_name = instance._meta.model_name
     id = str(instance.id)
     group_name = CHANNELS_GROUP_NAME.format(model=model_name, id=id)
     serializer_name = f"{serializer.__module__}.{serializer.__name__}"
+    event = {
+        "type": "notify",
+        # Lets consumers share the work of fetching and serializing the
+        # instance for this event:
+        "event_id": uuid.uuid4().hex,
+        "instance": {"model": model_name, "id": id},
+        "serializer": serializer_name,
+        "inner_type": type_,
+    }
+    if not coalescer.offer(group_name, event, flush=type_ in TERMINAL_TYPES):
+        return
     channel_layer = get_channel_layer()
-    await channel_layer.group_send(
-        group_name,
-        {
-            "type": "notify",
-            "instance": {"model": model_name, "id": id},
-            "serializer": serializer_name,
-            "inner_type": type_,
-        },
-    )
+    await channel_layer.group_send(group_name, event)
 
 
 async def user_token_expired(user):
@@ -118,22 +222,11 @@ async def notify_post_job(job):
 
 
 async def notify_org_result_changed(result):
-    from .serializers import OrgSerializer
-    from .models import Job, PreflightResult
+    from .org_activity import get_org_activity
 
     type_ = "ORG_CHANGED"
     org_url = result.organization_url
-
-    current_job = Job.objects.filter(
-        organization_url=org_url, status=Job.Status.started
-    ).first()
-    current_preflight = PreflightResult.objects.filter(
-        organization_url=org_url, status=PreflightResult.Status.started
-    ).first()
-    serializer = OrgSerializer(
-        {"current_job": current_job, "current_preflight": current_preflight}
-    )
-    message = {"type": type_, "payload": serializer.data}
+    message = {"type": type_, "payload": get_org_activity(org_url)}
     group_name = CHANNELS_GROUP_NAME.format(
         model="org", id=convert_org_url_to_key(org_url)
     )
@@ -0,0 +1,92 @@
+"""
+Importing custom task classes from a checked-out repo, without putting
+the repo on sys.path.
+
+While a flow runs inside ``repo_imports(root)``, top-level modules that
+aren't found among the builtins are looked for in root first, the way
+they would be if root were at the front of sys.path. That only happens
+in the context that entered repo_imports, so a flow running in another
+thread or task doesn't pick up this repo's modules by accident. On the
+way out, every module imported from the repo is dropped from
+sys.modules, so the next job (which may be for another repo, or another
+commit of this one) imports its own.
+
+Only modules and regular packages are taken from root. On sys.path, a
+plain directory (like the robot/ directory most CumulusCI projects have)
+only becomes a namespace package if nothing else by that name is
+installed; looked for first, it would hide the installed package.
+"""
+
+import contextlib
+import sys
+from contextvars import ContextVar
+from importlib.machinery import PathFinder
+
+current_repo = ContextVar("current_repo", default=None)
+
+
+class RepoImports:
+    def __init__(self, root):
+        self.root = root
+        # The top-level modules found in root, so they can be dropped
+        # (along with their submodules) once the job is done:
+        self.module_names = set()
+
+    def find_spec(self, fullname, target=None):
+        spec = PathFinder.find_spec(fullname, [self.root], target)
+        # A namespace package has no loader; leave those to sys.path:
+        if spec is None or spec.loader is None:
+            return None
+        self.module_names.add(fullname)
+        return spec
+
+    def forget_modules(self):
+        for name in list(sys.modules):
+            if name.partition(".")[0] in self.module_names:
+                del sys.modules[name]
+
+
+class RepoFinder:
+    """
+    A meta path finder for top-level modules in the current repo.
+    Submodules of those are found through their package's __path__, as
+    usual.
+    """
+
+    @classmethod
+    def find_spec(cls, fullname, path=None, target=None):
+        repo = current_repo.get()
+        if repo is None or path is not None:
+            return None
+        return repo.find_spec(fullname, target)
+
+    @classmethod
+    def invalidate_caches(cls):
+        pass
+
+
+def install_repo_finder():
+    if RepoFinder in sys.meta_path:
+        return
+    # Just ahead of PathFinder, so the repo shadows installed packages
+    # but not builtin or frozen modules:
+    try:
+        index = sys.meta_path.index(PathFinder)
+    except ValueError:  # pragma: nocover
+        index = len(sys.meta_path)
+    sys.meta_path.insert(index, RepoFinder)
+
+
+@contextlib.contextmanager
+def repo_imports(root):
+    """
+    Make the modules in the repo at root importable for the duration.
+    """
+    install_repo_finder()
+    repo = RepoImports(root)
+    token = current_repo.set(repo)
+    try:
+        yield repo
+    finally:
+        current_repo.reset(token)
+        repo.forget_modules()
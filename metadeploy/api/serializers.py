@@ -6,7 +6,6 @@ from rest_framework import serializers
 from rest_framework.fields import SkipField
 from rest_framework.relations import PKOnlyObject
 
-from .constants import ERROR, WARN
 from .models import Job, Plan, PreflightResult, Product, SiteProfile, Step, Version
 
 User = get_user_model()
@@ -18,24 +17,15 @@ class IdOnlyField(serializers.CharField):
 
 
 class ErrorWarningCountMixin:
-    @staticmethod
-    def _count_status_in_results(results, status_name):
-        count = 0
-        for val in results.values():
-            for status in val:
-                if status["status"] == status_name:
-                    count += 1
-        return count
-
     def get_error_count(self, obj):
         if obj.status == self.Meta.model.Status.started:
             return 0
-        return self._count_status_in_results(obj.results, ERROR)
+        return obj.error_count
 
     def get_warning_count(self, obj):
         if obj.status == self.Meta.model.Status.started:
             return 0
-        return self._count_status_in_results(obj.results, WARN)
+        return obj.warning_count
 
 
 class CircumspectSerializerMixin:
@@ -255,6 +245,7 @@ class JobSerializer(ErrorWarningCountMixin, serializers.ModelSerializer):
     creator = serializers.SerializerMethodField()
     user_can_edit = serializers.SerializerMethodField()
     message = serializers.SerializerMethodField()
+    log_tail = serializers.SerializerMethodField()
 
     class Meta:
         model = Job
@@ -278,6 +269,7 @@ class JobSerializer(ErrorWarningCountMixin, serializers.ModelSerializer):
             "is_public",
             "user_can_edit",
             "message",
+            "log_tail",
         )
         extra_kwargs = {
             "created_at": {"read_only": True},
@@ -301,6 +293,17 @@ class JobSerializer(ErrorWarningCountMixin, serializers.ModelSerializer):
         except (AttributeError, KeyError):
             return False
 
+    @staticmethod
+    def audience(instance, user):
+        """
+        Users with the same audience see the same serialization of
+        instance. This must cover everything the per-user fields
+        (creator, org_name, organization_url, user_can_edit, log_tail)
+        depend on.
+        """
+        is_owner = user.pk is not None and user.pk == instance.user_id
+        return (is_owner or user.is_staff, is_owner)
+
     def get_message(self, obj):
         return (
             getattr(obj.plan.plan_template, "post_install_message_markdown", "")
@@ -328,6 +331,11 @@ class JobSerializer(ErrorWarningCountMixin, serializers.ModelSerializer):
             return obj.organization_url
         return None
 
+    def get_log_tail(self, obj):
+        if self.requesting_user_has_rights() and obj.status == Job.Status.started:
+            return obj.log_tail
+        return None
+
     @staticmethod
     def _has_valid_preflight(most_recent_preflight):
         if not most_recent_preflight:
@@ -414,7 +422,7 @@ class PreflightResultSerializer(ErrorWarningCountMixin, serializers.ModelSeriali
         return (
             obj.is_valid
             and obj.status == PreflightResult.Status.complete
-            and self._count_status_in_results(obj.results, ERROR) == 0
+            and obj.error_count == 0
         )
 
     class Meta:
@@ -2,8 +2,8 @@ import pytest
 from django.contrib.admin.sites import AdminSite
 from django.test import RequestFactory
 
-from ..admin import AllowedListOrgAdmin, PlanAdmin, PlanMixin
-from ..models import AllowedListOrg, Plan
+from ..admin import AllowedListOrgAdmin, HasErrorsFilter, JobAdmin, PlanAdmin, PlanMixin
+from ..models import AllowedListOrg, Job, Plan
 
 
 class Dummy:
@@ -72,3 +72,20 @@ class TestPlanAdmin:
         obj.version = Dummy()
         obj.version.label = "A version"
         assert admin.version_label(obj) == obj.version.label
+
+
+@pytest.mark.django_db
+class TestHasErrorsFilter:
+    def filter_jobs(self, value):
+        request = RequestFactory().get("/admin")
+        params = {} if value is None else {"has_errors": value}
+        has_errors = HasErrorsFilter(request, params, Job, JobAdmin(Job, AdminSite()))
+        return set(has_errors.queryset(request, Job.objects.all()))
+
+    def test_queryset(self, job_factory):
+        job_with_errors = job_factory(results={"1": [{"status": "error"}]})
+        job_without_errors = job_factory()
+
+        assert self.filter_jobs("yes") == {job_with_errors}
+        assert self.filter_jobs("no") == {job_without_errors}
+        assert self.filter_jobs(None) == {job_with_errors, job_without_errors}
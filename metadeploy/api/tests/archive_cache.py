@@ -0,0 +1,237 @@
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from ..archive_cache import ArchiveCache, get_stats, record_stat
+
+
+def write_tree(path, files):
+    for name, content in files.items():
+        full_path = os.path.join(path, name)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+
+
+def make_populate(files):
+    populate = MagicMock()
+
+    def side_effect(path):
+        write_tree(path, files)
+        return True
+
+    populate.side_effect = side_effect
+    return populate
+
+
+def read_tree(path):
+    ret = {}
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            full_path = os.path.join(dirpath, filename)
+            with open(full_path) as f:
+                ret[os.path.relpath(full_path, path)] = f.read()
+    return ret
+
+
+@pytest.fixture
+def record(mocker):
+    return mocker.patch("metadeploy.api.archive_cache.record_stat")
+
+
+class TestFromSettings:
+    def test_disabled(self, settings):
+        settings.REPO_ARCHIVE_CACHE_MAX_SIZE = 0
+        assert ArchiveCache.from_settings() is None
+
+    def test_enabled(self, settings, tmp_path):
+        settings.REPO_ARCHIVE_CACHE_DIR = str(tmp_path / "cache")
+        settings.REPO_ARCHIVE_CACHE_MAX_SIZE = 1000
+        settings.REPO_ARCHIVE_CACHE_HARDLINK = True
+
+        archive_cache = ArchiveCache.from_settings()
+
+        assert archive_cache.max_size == 1000
+        assert archive_cache.hardlink
+        assert os.path.isdir(archive_cache.root)
+
+
+class TestCheckout:
+    def test_miss_then_hit(self, tmp_path, record):
+        archive_cache = ArchiveCache(str(tmp_path / "cache"), 1000)
+        files = {"cumulusci.yml": "project: {}", "src/package.xml": "<xml/>"}
+        populate = make_populate(files)
+
+        for dest_name in ("first", "second"):
+            dest = tmp_path / dest_name
+            dest.mkdir()
+            assert archive_cache.checkout(
+                owner="owner",
+                repo_name="repo",
+                sha="abc123",
+                dest=str(dest),
+                populate=populate,
+            )
+            assert read_tree(str(dest)) == files
+
+        assert populate.call_count == 1
+        assert [call[0][0] for call in record.call_args_list] == ["misses", "hits"]
+
+    def test_no_dest(self, tmp_path, record):
+        archive_cache = ArchiveCache(str(tmp_path / "cache"), 1000)
+        populate = make_populate({"cumulusci.yml": ""})
+
+        for _ in range(2):
+            assert archive_cache.checkout(
+                owner="owner",
+                repo_name="repo",
+                sha="abc123",
+                dest=None,
+                populate=populate,
+            )
+
+        assert populate.call_count == 1
+        entry = archive_cache.entry_path(owner="owner", repo_name="repo", sha="abc123")
+        assert os.listdir(entry) == ["cumulusci.yml"]
+
+    def test_unsafe(self, tmp_path, record):
+        archive_cache = ArchiveCache(str(tmp_path / "cache"), 1000)
+        dest = tmp_path / "dest"
+        dest.mkdir()
+
+        assert not archive_cache.checkout(
+            owner="owner",
+            repo_name="repo",
+            sha="abc123",
+            dest=str(dest),
+            populate=lambda path: False,
+        )
+
+        assert os.listdir(str(dest)) == []
+        assert os.listdir(archive_cache.root) == [".lock"]
+
+    def test_hardlink_and_symlink(self, tmp_path, record):
+        archive_cache = ArchiveCache(str(tmp_path / "cache"), 1000, hardlink=True)
+        dest = tmp_path / "dest"
+        dest.mkdir()
+
+        def populate(path):
+            write_tree(path, {"a.txt": "a"})
+            os.symlink("a.txt", os.path.join(path, "b.txt"))
+            return True
+
+        archive_cache.checkout(
+            owner="owner",
+            repo_name="repo",
+            sha="abc123",
+            dest=str(dest),
+            populate=populate,
+        )
+
+        entry = archive_cache.entry_path(owner="owner", repo_name="repo", sha="abc123")
+        assert os.path.samefile(str(dest / "a.txt"), os.path.join(entry, "a.txt"))
+        assert os.readlink(str(dest / "b.txt")) == "a.txt"
+
+    def test_lost_race(self, tmp_path, record):
+        archive_cache = ArchiveCache(str(tmp_path / "cache"), 1000)
+        entry = archive_cache.entry_path(owner="owner", repo_name="repo", sha="abc123")
+        dest = tmp_path / "dest"
+        dest.mkdir()
+
+        def populate(path):
+            # Simulate another worker finishing first:
+            write_tree(entry, {"theirs.txt": "theirs"})
+            write_tree(path, {"ours.txt": "ours"})
+            return True
+
+        archive_cache.checkout(
+            owner="owner",
+            repo_name="repo",
+            sha="abc123",
+            dest=str(dest),
+            populate=populate,
+        )
+
+        assert read_tree(str(dest)) == {"ours.txt": "ours"}
+        assert read_tree(entry) == {"theirs.txt": "theirs"}
+        assert not any(
+            name.startswith(".staging-") for name in os.listdir(archive_cache.root)
+        )
+
+
+class TestEviction:
+    def test_evicts_least_recently_used(self, tmp_path, record):
+        archive_cache = ArchiveCache(str(tmp_path / "cache"), 15)
+        for i, sha in enumerate(("old", "used", "new")):
+            dest = tmp_path / sha
+            dest.mkdir()
+            archive_cache.checkout(
+                owner="owner",
+                repo_name="repo",
+                sha=sha,
+                dest=str(dest),
+                populate=make_populate({"file.txt": "x" * 5}),
+            )
+            entry = archive_cache.entry_path(owner="owner", repo_name="repo", sha=sha)
+            os.utime(entry, (i, i))
+
+        # A hit on "used" makes it the most recent, so "old" goes next:
+        (tmp_path / "again").mkdir()
+        archive_cache.checkout(
+            owner="owner",
+            repo_name="repo",
+            sha="used",
+            dest=str(tmp_path / "again"),
+            populate=MagicMock(),
+        )
+        (tmp_path / "newest").mkdir()
+        archive_cache.checkout(
+            owner="owner",
+            repo_name="repo",
+            sha="newest",
+            dest=str(tmp_path / "newest"),
+            populate=make_populate({"file.txt": "x" * 5}),
+        )
+
+        remaining = sorted(
+            name
+            for name in os.listdir(archive_cache.root)
+            if os.path.isdir(os.path.join(archive_cache.root, name))
+        )
+        assert remaining == ["owner.repo.new", "owner.repo.newest", "owner.repo.used"]
+        record.assert_any_call("evictions", 1)
+
+    def test_never_evicts_new_entry(self, tmp_path, record):
+        archive_cache = ArchiveCache(str(tmp_path / "cache"), 1)
+        dest = tmp_path / "dest"
+        dest.mkdir()
+
+        archive_cache.checkout(
+            owner="owner",
+            repo_name="repo",
+            sha="abc123",
+            dest=str(dest),
+            populate=make_populate({"file.txt": "too big"}),
+        )
+
+        entry = archive_cache.entry_path(owner="owner", repo_name="repo", sha="abc123")
+        assert os.path.isdir(entry)
+
+    def test_missing_size_file(self, tmp_path, record):
+        archive_cache = ArchiveCache(str(tmp_path / "cache"), 1000)
+        entry = archive_cache.entry_path(owner="owner", repo_name="repo", sha="abc123")
+        write_tree(entry, {"file.txt": "12345"})
+
+        assert archive_cache._entry_size(entry) == 5
+
+
+def test_stats():
+    before = get_stats()
+    record_stat("hits")
+    record_stat("evictions", 2)
+    after = get_stats()
+
+    assert after["hits"] == before["hits"] + 1
+    assert after["evictions"] == before["evictions"] + 2
+    assert after["misses"] == before["misses"]
@@ -52,3 +52,67 @@ def test_obscure_mpinstaller_deployment_test_failure():
     text = "Apex Test Failure: "
     expected = "Apex Test Failure"
     assert obscure_mpinstaller_deployment_test_failure(text) == expected
+
+
+def test_obscure_salesforce_log__ids():
+    text = "Deployed 001000000000001ABC, not abc000000000001, then 001000000000001."
+    expected = "Deployed 001...ABC, not abc000000000001, then 001...."
+    assert obscure_salesforce_log(text) == expected
+
+
+def test_obscure_salesforce_log__id_found_anywhere():
+    # The second occurrence isn't aligned to its run, but is obscured
+    # because the first one was found:
+    text = "00D000000000001 x00D000000000001"
+    expected = "00D... x00D..."
+    assert obscure_salesforce_log(text) == expected
+
+
+def test_obscure_salesforce_log__error_id_is_an_id():
+    text = (
+        "Please include this ErrorId if you contact support: "
+        "0010000000000012-123 (123456)"
+    )
+    expected = (
+        "Please include this ErrorId if you contact support: 001...2-123 (123456)"
+    )
+    assert obscure_salesforce_log(text) == expected
+
+
+def test_obscure_salesforce_log__id_in_org_name():
+    text = "Organization Name: 00D000000000001\nOrganization ID: 00D000000000001"
+    expected = "Organization Name: <ORG_NAME>\nOrganization ID: 00D..."
+    assert obscure_salesforce_log(text) == expected
+
+
+def test_obscure_salesforce_log__chunks():
+    chunks = ["(Required: 1, Available: 2)\n", "Deploying 001000000000001\n"]
+    assert "".join(obscure_salesforce_log(chunk) for chunk in chunks) == (
+        "(Required: <X>, Available: <Y>)\nDeploying 001...\n"
+    )
+
+
+def test_obscure_salesforce_log__glued_org_name():
+    text = (
+        "Failed on a098597Organization Name: Foo 084abcdefghijklm\n"
+        "Organization ID: 00D000000000001"
+    )
+    expected = "Failed on a098597Organization Name: <ORG_NAME>\nOrganization ID: 00D..."
+    assert obscure_salesforce_log(text) == expected
+
+
+def test_obscure_salesforce_log__glued_error_id():
+    text = (
+        "abcdefghiPlease include this ErrorId if you contact support: "
+        "000000-000 (000000)"
+    )
+    expected = "abcdefghiPlease include this ErrorId if you contact support: <ERROR_ID>"
+    assert obscure_salesforce_log(text) == expected
+
+
+def test_obscure_salesforce_log__overlapping_ids():
+    # Both IDs occur, overlapping, in the last run. The one found first
+    # is obscured there, as replacing each ID in turn always has:
+    text = "001CCCCCCCCCCCC 00DXXXXXX001CCC x00DXXXXXX001CCCCCCCCCCCC"
+    expected = "001... 00D... x00DXXXXXX001..."
+    assert obscure_salesforce_log(text) == expected
@@ -0,0 +1,319 @@
+"""
+Performance benchmarks. These are slow and timing-sensitive, so they are
+excluded from the default test run. Run them with::
+
+    pytest -m benchmark -s metadeploy/api/tests/benchmarks.py
+"""
+
+import logging
+import os
+import re
+import shutil
+import time
+import zipfile
+from datetime import timedelta
+from glob import glob
+from io import BytesIO, StringIO
+from itertools import chain
+from unittest.mock import MagicMock, sentinel
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from ..belvedere_utils import SALESFORCE_OID_PREFIXES, obscure_salesforce_log
+from ..flows import JobFlowCallback, current_log_handler
+from ..jobs import extract_zip_file, is_safe_path
+from ..models import Job, PreflightResult
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def report(name, **timings):
+    print()
+    for label, seconds in timings.items():
+        print(f"{name} {label}: {seconds * 1000:.1f}ms")
+
+
+@pytest.fixture(scope="module")
+def synthetic_zipball():
+    """
+    A zipball laid out the way GitHub lays them out, with 10,000 small
+    metadata files spread over a few hundred directories.
+    """
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("owner-repo-abc123/", "")
+        zip_file.writestr("owner-repo-abc123/cumulusci.yml", "project: {}\n")
+        for i in range(10000):
+            zip_file.writestr(
+                f"owner-repo-abc123/src/objects{i // 50}/Object{i}__c.object",
+                f"<CustomObject>{i}</CustomObject>\n" * 20,
+            )
+    return archive.getvalue()
+
+
+def legacy_extract(zipball_bytes, path):
+    """
+    The write-to-disk, extractall, shuffle-and-rename approach that
+    extract_zipball replaced.
+    """
+    zip_file_name = os.path.join(path, "archive.zip")
+    with open(zip_file_name, "wb") as f:
+        f.write(zipball_bytes)
+    zip_file = zipfile.ZipFile(zip_file_name)
+    assert all(is_safe_path(info.filename) for info in zip_file.infolist())
+    zip_file.extractall(path)
+    zipball_root = glob(os.path.join(path, "owner-repo-*"))[0]
+    renamed_root = os.path.join(path, "zipball_root")
+    shutil.move(zipball_root, renamed_root)
+    for child in chain(
+        glob(os.path.join(renamed_root, "*")), glob(os.path.join(renamed_root, ".*"))
+    ):
+        shutil.move(child, path)
+    shutil.rmtree(renamed_root)
+
+
+def streaming_extract(zipball_bytes, path):
+    with zipfile.ZipFile(BytesIO(zipball_bytes)) as zip_file:
+        assert extract_zip_file(zip_file, path)
+
+
+@pytest.mark.benchmark
+def test_extract_zipball(tmp_path, synthetic_zipball):
+    legacy_path = tmp_path / "legacy"
+    streaming_path = tmp_path / "streaming"
+    legacy_path.mkdir()
+    streaming_path.mkdir()
+
+    legacy = timed(legacy_extract, synthetic_zipball, str(legacy_path))
+    streaming = timed(streaming_extract, synthetic_zipball, str(streaming_path))
+
+    report("extract 10k files", legacy=legacy, streaming=streaming)
+    assert os.listdir(str(streaming_path / "src")) == os.listdir(
+        str(legacy_path / "src")
+    )
+    assert streaming < legacy
+
+
+LOG_TASKS = 200
+LOG_LINES_PER_TASK = 200
+
+
+class LegacyJobFlowCallback(JobFlowCallback):
+    """
+    Saves the log the way JobFlowCallback did before log chunks: the
+    whole buffer, obscured and written back on every task.
+    """
+
+    def pre_flow(self, coordinator):
+        logger = super().pre_flow(coordinator)
+        self.string_buffer = StringIO()
+        self.handler = logging.StreamHandler(stream=self.string_buffer)
+        current_log_handler.set(self.handler)
+        return logger
+
+    def post_task(self, step, result):
+        self.context.results[self._get_step_id(step.path)] = [{"status": "ok"}]
+        self.context.log = obscure_salesforce_log(self.string_buffer.getvalue())
+        self.context.save()
+
+
+def time_log_saves(callback_class, job, steps):
+    """
+    Run a fake flow through callbacks of callback_class, and return how
+    long each post_task took.
+    """
+    callbacks = callback_class(job)
+    result = MagicMock(exception=None)
+    timings = []
+    callbacks.pre_flow(sentinel.flow_coordinator)
+    try:
+        for step in steps:
+            for line in range(LOG_LINES_PER_TASK):
+                callbacks.logger.info(
+                    f"{step.path}: deployed component {line} to 00D000000000001"
+                )
+            timings.append(
+                timed(callbacks.post_task, MagicMock(path=step.path), result)
+            )
+    finally:
+        callbacks.post_flow(sentinel.flow_coordinator)
+    return timings
+
+
+def mean(values):
+    return sum(values) / len(values)
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_log_saves(plan_factory, step_factory, job_factory):
+    plan = plan_factory()
+    steps = [step_factory(plan=plan, path=f"task_{i}") for i in range(LOG_TASKS)]
+
+    legacy = time_log_saves(LegacyJobFlowCallback, job_factory(plan=plan), steps)
+    chunked = time_log_saves(JobFlowCallback, job_factory(plan=plan), steps)
+
+    report(
+        f"post_task over {LOG_TASKS} tasks",
+        legacy_first_10=mean(legacy[:10]),
+        legacy_last_10=mean(legacy[-10:]),
+        chunked_first_10=mean(chunked[:10]),
+        chunked_last_10=mean(chunked[-10:]),
+    )
+    # Legacy saves grow with the log; chunked saves shouldn't:
+    assert mean(chunked[-10:]) < mean(legacy[-10:])
+    assert mean(chunked[-10:]) < 3 * mean(chunked[:10])
+
+
+def legacy_obscure_salesforce_log(text):
+    """
+    obscure_salesforce_log as it was before it was a single pass: one
+    scan for IDs, checked against a list of prefixes, then one
+    substitution per kind of detail.
+    """
+    if "Apex Test Failure: " in text:
+        return "Apex Test Failure"
+    prefixes = list(SALESFORCE_OID_PREFIXES)
+    replace = []
+    for match in re.findall(r"([a-zA-Z0-9]{3})([a-zA-Z0-9]{12}|[a-zA-Z0-9]{15})", text):
+        if match[0] in prefixes:
+            replace_t = ("%s%s" % match, "%s..." % match[0])
+            if replace_t not in replace:
+                replace.append(replace_t)
+    for replace_t in replace:
+        text = text.replace(replace_t[0], replace_t[1])
+    text = re.sub(
+        r"(\(Required: )[0-9]{1,4}(, Available: )[0-9]{1,4}(\))", r"\1<X>\2<Y>\3", text
+    )
+    text = re.sub(
+        (
+            r"(Please include this ErrorId if you contact support: )"
+            r"([0-9]{6,18}-[0-9]{3,10} \([0-9]{6,14}\))"
+        ),
+        r"\1<ERROR_ID>",
+        text,
+    )
+    return re.sub(
+        r"(Organization Name: )(.*)(\nOrganization ID:)", r"\1<ORG_NAME>\3", text
+    )
+
+
+@pytest.fixture(scope="module")
+def synthetic_deploy_log():
+    """
+    A few MB of CumulusCI deploy output: component lines full of record
+    IDs, with the occasional limit, ErrorId and org block mixed in.
+    """
+    lines = []
+    for i in range(20000):
+        lines.append(
+            f"2019-06-01 12:00:00: [{i}] Deployed Object{i}__c "
+            f"(a0{i % 10}1F{i % 400:010d}) to 00D1F0000009Gpn "
+            f"as 005{i % 50:012d} in 04t{i % 97:012d}AAA"
+        )
+        if i % 500 == 0:
+            lines.append(
+                "Too many SOQL queries (Required: 101, Available: 100)\n"
+                "Please include this ErrorId if you contact support: "
+                f"{i + 123456}-2837 (1234567890)\n"
+                "Organization Name: Acme Nonprofit\n"
+                "Organization ID: 00D1F0000009Gpn"
+            )
+    return "\n".join(lines)
+
+
+@pytest.mark.benchmark
+def test_obscure_salesforce_log(synthetic_deploy_log):
+    assert obscure_salesforce_log(synthetic_deploy_log) == (
+        legacy_obscure_salesforce_log(synthetic_deploy_log)
+    )
+
+    legacy = timed(legacy_obscure_salesforce_log, synthetic_deploy_log)
+    single_pass = timed(obscure_salesforce_log, synthetic_deploy_log)
+
+    report(
+        f"obscure {len(synthetic_deploy_log) // 1024}KB log",
+        legacy=legacy,
+        single_pass=single_pass,
+    )
+    assert single_pass < legacy
+
+
+SEED_ROWS = 200_000
+SEED_ORGS = 5_000
+
+
+@pytest.fixture
+def seeded_results(user_factory, plan_factory):
+    """
+    Enough Jobs and PreflightResults, spread over enough orgs, users and
+    plans, that Postgres would rather use a suitable index than scan.
+    Almost all of them finished long ago, as in production.
+    """
+    users = [user_factory() for _ in range(20)]
+    plans = [plan_factory() for _ in range(5)]
+    long_ago = timezone.now() - timedelta(days=30)
+
+    def seed(model, **extra):
+        model.objects.bulk_create(
+            (
+                model(
+                    user=users[i % len(users)],
+                    plan=plans[i % len(plans)],
+                    organization_url=f"https://org{i % SEED_ORGS}.example.com/",
+                    status="complete",
+                    **extra,
+                )
+                for i in range(SEED_ROWS)
+            ),
+            batch_size=5000,
+        )
+        # auto_now_add ignores what we pass, so age them afterwards:
+        model.objects.update(created_at=long_ago)
+
+    seed(Job, enqueued_at=long_ago)
+    seed(PreflightResult, is_valid=False)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE api_job")
+        cursor.execute("ANALYZE api_preflightresult")
+    return users, plans
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_hot_queries_use_indexes(seeded_results):
+    users, plans = seeded_results
+    org_url = "https://org1.example.com/"
+    preflight_lifetime_ago = timezone.now() - timedelta(minutes=10)
+    plans_by_index = {
+        # These mirror the .first() calls, which order by pk:
+        "job_started_org_idx": Job.objects.filter(
+            organization_url=org_url, status=Job.Status.started
+        ).order_by("pk")[:1],
+        "job_pending_idx": Job.objects.filter(enqueued_at=None).order_by("created_at")[
+            :100
+        ],
+        "preflight_started_org_idx": PreflightResult.objects.filter(
+            organization_url=org_url, status=PreflightResult.Status.started
+        ).order_by("pk")[:1],
+        "preflight_user_plan_idx": PreflightResult.objects.filter(
+            user=users[0], plan=plans[0], is_valid=True, status="complete"
+        ).order_by("-created_at")[:1],
+        "preflight_expirable_idx": PreflightResult.objects.filter(
+            status=PreflightResult.Status.complete,
+            created_at__lte=preflight_lifetime_ago,
+            is_valid=True,
+        ),
+    }
+
+    for index_name, queryset in plans_by_index.items():
+        query_plan = queryset.explain()
+        print()
+        print(query_plan)
+        assert index_name in query_plan
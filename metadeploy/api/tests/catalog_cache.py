@@ -0,0 +1,139 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..catalog_cache import get_generation, visibility_fingerprint
+from ..constants import ORGANIZATION_DETAILS
+
+
+@pytest.fixture
+def catalog_cache(settings):
+    settings.CATALOG_CACHE_TIMEOUT = 60
+
+
+@pytest.mark.django_db
+class TestCachedResponse:
+    def test_hit(self, catalog_cache, django_assert_num_queries, plan_factory):
+        plan = plan_factory()
+        client = APIClient()
+        url = reverse("product-detail", kwargs={"pk": plan.version.product.id})
+        first = client.get(url)
+
+        with django_assert_num_queries(0):
+            second = client.get(url)
+
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert second["ETag"] == first["ETag"]
+
+    def test_not_modified(self, catalog_cache, plan_factory):
+        plan = plan_factory()
+        client = APIClient()
+        url = reverse("plan-detail", kwargs={"pk": plan.id})
+        etag = client.get(url)["ETag"]
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        assert not response.content
+
+    def test_invalidated_on_save(self, catalog_cache, plan_factory):
+        plan = plan_factory()
+        client = APIClient()
+        url = reverse("plan-detail", kwargs={"pk": plan.id})
+        etag = client.get(url)["ETag"]
+
+        plan.title = "Changed"
+        plan.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.json()["title"] == "Changed"
+        assert response["ETag"] != etag
+
+    def test_invalidated_on_delete(self, catalog_cache, step_factory):
+        step = step_factory()
+        client = APIClient()
+        url = reverse("plan-detail", kwargs={"pk": step.plan.id})
+        assert len(client.get(url).json()["steps"]) == 1
+
+        step.delete()
+
+        assert client.get(url).json()["steps"] == []
+
+    def test_keyed_by_visibility(
+        self, catalog_cache, allowed_list_org_factory, plan_factory, user_factory
+    ):
+        allowed_list_org = allowed_list_org_factory()
+        plan = plan_factory(visible_to=allowed_list_org.allowed_list)
+        url = reverse("plan-detail", kwargs={"pk": plan.id})
+        assert not APIClient().get(url).json()["is_allowed"]
+
+        user = user_factory()
+        social_account = user.socialaccount_set.first()
+        social_account.extra_data[ORGANIZATION_DETAILS]["Id"] = allowed_list_org.org_id
+        social_account.save()
+        client = APIClient()
+        client.force_login(user)
+
+        assert client.get(url).json()["is_allowed"]
+
+    def test_keyed_by_host(self, settings, catalog_cache, product_factory):
+        settings.ALLOWED_HOSTS = ["one.example.com", "two.example.com"]
+        settings.DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+        settings.MEDIA_URL = "/media/"
+        product = product_factory(image="logo.png")
+        url = reverse("product-detail", kwargs={"pk": product.id})
+        client = APIClient()
+
+        one = client.get(url, HTTP_HOST="one.example.com").json()
+        two = client.get(url, HTTP_HOST="two.example.com").json()
+
+        assert one["image"] == "http://one.example.com/media/logo.png"
+        assert two["image"] == "http://two.example.com/media/logo.png"
+
+    def test_errors_not_cached(self, catalog_cache):
+        client = APIClient()
+        url = reverse("plan-detail", kwargs={"pk": "missing"})
+        assert client.get(url).status_code == 404
+
+        response = client.get(url)
+
+        assert response.status_code == 404
+        assert "ETag" not in response
+
+    def test_disabled(self, plan_factory):
+        plan = plan_factory()
+        response = APIClient().get(reverse("plan-detail", kwargs={"pk": plan.id}))
+
+        assert response.status_code == 200
+        assert "ETag" not in response
+
+
+def test_get_generation():
+    generation = get_generation()
+
+    assert generation
+    assert get_generation() == generation
+
+
+class TestVisibilityFingerprint:
+    def test_anonymous(self):
+        assert visibility_fingerprint(AnonymousUser()) == "public"
+
+    @pytest.mark.django_db
+    def test_superuser(self, user_factory):
+        assert visibility_fingerprint(user_factory(is_superuser=True)) == "all"
+
+    @pytest.mark.django_db
+    def test_no_allowed_lists(self, user_factory):
+        assert visibility_fingerprint(user_factory()) == "public"
+
+    @pytest.mark.django_db
+    def test_allowed_lists(self, user_factory):
+        user = user_factory()
+        user.allowed_list_ids = frozenset((3, 1))
+
+        assert visibility_fingerprint(user) == "1,3"
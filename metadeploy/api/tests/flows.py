@@ -1,3 +1,5 @@
+import logging
+import threading
 from unittest.mock import MagicMock, sentinel
 
 import pytest
@@ -8,19 +10,127 @@ from ..flows import (
     BasicFlowCallback,
     JobFlowCallback,
     PreflightFlowCallback,
+    ScrubbingLogHandler,
     StopFlowException,
 )
-from ..models import Step
 
 
 def test_get_step_id(mocker):
     callbacks = BasicFlowCallback(sentinel.result)
-    callbacks._steps = Step.objects.none()
+    callbacks._step_ids = {}
     result = callbacks._get_step_id("anything")
 
     assert result is None
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize("step_count", [1, 60])
+def test_get_step_id__constant_queries(
+    django_assert_num_queries, plan_factory, step_factory, job_factory, step_count
+):
+    plan = plan_factory()
+    steps = [step_factory(plan=plan, path=f"task_{i}") for i in range(step_count)]
+    job = job_factory(plan=plan)
+    callbacks = BasicFlowCallback(job)
+
+    with django_assert_num_queries(1):
+        callbacks.pre_flow(sentinel.flow_coordinator)
+    with django_assert_num_queries(0):
+        step_ids = [callbacks._get_step_id(step.path) for step in steps]
+
+    assert step_ids == [str(step.id) for step in steps]
+
+
+@pytest.mark.django_db
+def test_get_step_id__duplicate_path(plan_factory, step_factory, job_factory):
+    plan = plan_factory()
+    step_factory(plan=plan, path="task", step_num="2")
+    first = step_factory(plan=plan, path="task", step_num="1")
+    job = job_factory(plan=plan)
+    callbacks = BasicFlowCallback(job)
+
+    assert callbacks._get_step_id("task") == str(first.id)
+
+
+class TestScrubbingLogHandler:
+    def make_logger(self, handler):
+        logger = logging.getLogger("metadeploy.api.tests.flows.scrubbing")
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        logger.handlers = [handler]
+        return logger
+
+    def test_scrubs_and_batches(self):
+        sink = MagicMock()
+        handler = ScrubbingLogHandler(sink, flush_size=30, tail_lines=10)
+        logger = self.make_logger(handler)
+
+        logger.info("Deploying to 00D000000000001")
+        sink.assert_not_called()
+        logger.info("Deployed to 00D000000000001")
+        sink.assert_called_once_with("Deploying to 00D...\nDeployed to 00D...\n")
+
+        logger.info("Done")
+        handler.flush()
+        handler.flush()
+        assert sink.call_count == 2
+        sink.assert_called_with("Done\n")
+
+    def test_tail(self):
+        handler = ScrubbingLogHandler(MagicMock(), flush_size=1000, tail_lines=2)
+        logger = self.make_logger(handler)
+
+        logger.info("One")
+        logger.info("Two\nThree")
+
+        assert list(handler.tail) == ["Two", "Three"]
+
+    def test_scrubs_each_record_alone(self):
+        sink = MagicMock()
+        handler = ScrubbingLogHandler(sink, flush_size=1000, tail_lines=10)
+        logger = self.make_logger(handler)
+
+        # An org name is only recognised in a record that introduces it:
+        logger.info("Organization Name: Acme\nOrganization ID: 00D000000000001")
+        logger.info("Installing into Acme")
+        handler.flush()
+
+        sink.assert_called_once_with(
+            "Organization Name: <ORG_NAME>\nOrganization ID: 00D...\n"
+            "Installing into Acme\n"
+        )
+
+
+def test_concurrent_flows():
+    jobs = {"first": MagicMock(), "second": MagicMock()}
+    barrier = threading.Barrier(len(jobs))
+
+    def run_flow(name, job):
+        callbacks = JobFlowCallback(job)
+        callbacks.pre_flow(sentinel.flow_coordinator)
+        for i in range(20):
+            # Take turns, so that the two flows' records interleave:
+            barrier.wait()
+            logging.getLogger("cumulusci.core").info(f"{name} {i}")
+        callbacks.post_flow(sentinel.flow_coordinator)
+
+    threads = [
+        threading.Thread(target=run_flow, args=(name, job))
+        for name, job in jobs.items()
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for name, job in jobs.items():
+        log = "".join(call[0][0] for call in job.append_log.call_args_list)
+        assert log == "".join(f"{name} {i}\n" for i in range(20))
+    logging.getLogger("cumulusci").info("Outside any flow")
+    for job in jobs.values():
+        assert "Outside" not in str(job.append_log.call_args_list)
+
+
 class TestJobFlow:
     def test_init(self, mocker):
         callbacks = JobFlowCallback(sentinel.job)
@@ -57,6 +167,51 @@ class TestJobFlow:
 
         assert job.results == {str(step.id): [{"status": "ok"}] for step in steps}
 
+    @pytest.mark.django_db
+    def test_post_task__log_chunks(self, plan_factory, step_factory, job_factory):
+        plan = plan_factory()
+        steps = [step_factory(plan=plan, path=f"task_{i}") for i in range(2)]
+        job = job_factory(plan=plan, steps=steps)
+        callbacks = JobFlowCallback(job)
+        result = MagicMock(exception=None)
+
+        callbacks.pre_flow(sentinel.flow_coordinator)
+        for i, step in enumerate(steps):
+            callbacks.logger.info(f"Running task {i}")
+            callbacks.post_task(MagicMock(path=step.path), result)
+        callbacks.post_flow(sentinel.flow_coordinator)
+
+        assert list(job.log_chunks.values_list("text", flat=True)) == [
+            "Running task 0\n",
+            "Running task 1\n",
+        ]
+        assert job.full_log == "Running task 0\nRunning task 1\n"
+        assert job.log_tail == "Running task 0\nRunning task 1"
+
+    @pytest.mark.django_db
+    def test_post_task__log_batches(
+        self, settings, plan_factory, step_factory, job_factory
+    ):
+        settings.JOB_LOG_FLUSH_SIZE = 20
+        plan = plan_factory()
+        step = step_factory(plan=plan, path="task")
+        job = job_factory(plan=plan, steps=[step])
+        callbacks = JobFlowCallback(job)
+
+        callbacks.pre_flow(sentinel.flow_coordinator)
+        for i in range(3):
+            callbacks.logger.info(f"Deploying component {i}")
+        callbacks.post_task(MagicMock(path="task"), MagicMock(exception=None))
+        callbacks.logger.info("Cleaning up")
+        callbacks.post_flow(sentinel.flow_coordinator)
+
+        assert list(job.log_chunks.values_list("text", flat=True)) == [
+            "Deploying component 0\n",
+            "Deploying component 1\n",
+            "Deploying component 2\n",
+            "Cleaning up\n",
+        ]
+
     @pytest.mark.django_db
     def test_post_task__exception(
         self, mocker, user_factory, plan_factory, step_factory, job_factory
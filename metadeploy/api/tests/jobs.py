@@ -1,19 +1,27 @@
-from datetime import datetime, timedelta
+import os
+import zipfile
+from datetime import timedelta
 from unittest.mock import MagicMock
 
 import pytest
-import pytz
 import vcr
+from django.db import OperationalError, connection
 from django.utils import timezone
 from rq.worker import StopRequested
 
 from ..jobs import (
+    dispatcher,
     enqueuer,
     expire_preflights,
     expire_user_tokens,
+    extract_zip_file,
+    extract_zipball,
     mark_canceled,
+    prefetch_version,
     preflight,
+    release_lost_claims,
     run_flows,
+    wait_for_jobs,
 )
 from ..models import Job, PreflightResult
 
@@ -23,18 +31,11 @@ def test_report_error(mocker, job_factory, user_factory, plan_factory, step_fact
     report_error = mocker.patch("metadeploy.api.jobs.sync_report_error")
     user = user_factory()
     plan = plan_factory()
-    job = job_factory(user=user)
+    job = job_factory(user=user, plan=plan)
     steps = [step_factory(plan=plan)]
 
     with pytest.raises(Exception):
-        run_flows(
-            user=user,
-            plan=plan,
-            skip_tasks=steps,
-            organization_url=job.organization_url,
-            result_class=Job,
-            result_id=job.id,
-        )
+        run_flows(result_class=Job, result_id=job.id, skip_tasks=steps)
 
     assert report_error.called
     job.refresh_from_db()
@@ -49,16 +50,9 @@ def test_run_flows(mocker, job_factory, user_factory, plan_factory, step_factory
     user = user_factory()
     plan = plan_factory()
     steps = [step_factory(plan=plan)]
-    job = job_factory(user=user)
+    job = job_factory(user=user, plan=plan)
 
-    run_flows(
-        user=user,
-        plan=plan,
-        skip_tasks=steps,
-        organization_url=job.organization_url,
-        result_class=Job,
-        result_id=job.id,
-    )
+    run_flows(result_class=Job, result_id=job.id, skip_tasks=steps)
 
     assert run_flow.called
 
@@ -76,31 +70,204 @@ def test_run_flows__preflight(
     preflight_result = preflight_result_factory(user=user, plan=plan)
 
     run_flows(
-        user=user,
-        plan=plan,
-        skip_tasks=steps,
-        organization_url=preflight_result.organization_url,
-        result_class=PreflightResult,
-        result_id=preflight_result.id,
+        result_class=PreflightResult, result_id=preflight_result.id, skip_tasks=steps
     )
 
     assert run_flow.called
 
 
 @pytest.mark.django_db
-def test_enqueuer(mocker, job_factory):
-    delay = mocker.patch("metadeploy.api.jobs.run_flows_job.delay")
-    # Just a random UUID:
-    delay.return_value.id = "294fc6d2-0f3c-4877-b849-54184724b6b2"
-    october_first = datetime(2018, 10, 1, 12, 0, 0, 0, pytz.UTC)
-    delay.return_value.enqueued_at = october_first
+def test_run_flows__released(mocker, job_factory, user_factory, plan_factory):
+    run_flow = mocker.patch("cumulusci.core.flowrunner.FlowCoordinator.run")
+    get_github_repo = mocker.patch("metadeploy.api.jobs.get_github_repo")
+    get_current_job = mocker.patch("metadeploy.api.jobs.get_current_job")
+    get_current_job.return_value.id = "294fc6d2-0f3c-4877-b849-54184724b6b2"
+    job = job_factory(
+        user=user_factory(),
+        plan=plan_factory(),
+        job_id="5a7a3c4d-59cc-4ac0-9e4c-d2d3cb6e0a34",
+    )
+
+    run_flows(result_class=Job, result_id=job.id, skip_tasks=[])
+
+    assert not get_github_repo.called
+    assert not run_flow.called
+    job.refresh_from_db()
+    assert job.status == Job.Status.started
+
+
+@pytest.fixture
+def no_lost_claims(mocker):
+    return mocker.patch("metadeploy.api.jobs.release_lost_claims")
+
+
+@pytest.mark.django_db
+def test_enqueuer(mocker, no_lost_claims, job_factory):
+    get_queue = mocker.patch("metadeploy.api.jobs.get_queue")
     job = job_factory()
     enqueuer()
 
     job.refresh_from_db()
-    assert delay.called
+    enqueue_call = get_queue.return_value.enqueue_call
+    assert enqueue_call.called
     assert job.enqueued_at is not None
     assert job.job_id is not None
+    assert enqueue_call.call_args[1]["job_id"] == str(job.job_id)
+
+
+@pytest.mark.django_db
+def test_enqueuer__batches(
+    mocker, no_lost_claims, plan_factory, step_factory, job_factory
+):
+    get_queue = mocker.patch("metadeploy.api.jobs.get_queue")
+    plan = plan_factory()
+    step1 = step_factory(plan=plan, path="task1")
+    step_factory(plan=plan, path="task2")
+    job1 = job_factory(plan=plan, steps=[step1])
+    job2 = job_factory(plan=plan, steps=[step1])
+
+    enqueuer(batch_size=1)
+
+    enqueue_call = get_queue.return_value.enqueue_call
+    assert enqueue_call.call_count == 2
+    for call in enqueue_call.call_args_list:
+        kwargs = call[1]["kwargs"]
+        assert kwargs["skip_tasks"] == ["task2"]
+        # Only primitive values go over the wire:
+        assert all(
+            isinstance(value, (str, list)) or value is Job for value in kwargs.values()
+        )
+    assert {call[1]["kwargs"]["result_id"] for call in enqueue_call.call_args_list} == {
+        str(job1.id),
+        str(job2.id),
+    }
+    assert not Job.objects.filter(enqueued_at=None).exists()
+
+
+@pytest.mark.django_db
+def test_enqueuer__redis_failure(mocker, no_lost_claims, job_factory):
+    get_queue = mocker.patch("metadeploy.api.jobs.get_queue")
+    get_queue.return_value.enqueue_call.side_effect = [MagicMock(), OSError]
+    job1 = job_factory()
+    job2 = job_factory()
+
+    with pytest.raises(OSError):
+        enqueuer()
+
+    job1.refresh_from_db()
+    job2.refresh_from_db()
+    assert job1.enqueued_at is not None
+    assert job1.job_id is not None
+    assert job2.enqueued_at is None
+    assert job2.job_id is None
+
+
+@pytest.mark.django_db
+class TestReleaseLostClaims:
+    def claim(self, job_factory, **kwargs):
+        return job_factory(
+            enqueued_at=timezone.now() - timedelta(minutes=10),
+            job_id="294fc6d2-0f3c-4877-b849-54184724b6b2",
+            **kwargs,
+        )
+
+    def test_releases_unsent(self, mocker, settings, job_factory):
+        settings.JOB_CLAIM_TIMEOUT_SECONDS = 300
+        get_connection = mocker.patch("metadeploy.api.jobs.get_connection")
+        pipe = get_connection.return_value.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [False]
+        job = self.claim(job_factory)
+
+        release_lost_claims()
+
+        job.refresh_from_db()
+        assert job.enqueued_at is None
+        assert job.job_id is None
+
+    def test_leaves_sent(self, mocker, settings, job_factory):
+        settings.JOB_CLAIM_TIMEOUT_SECONDS = 300
+        get_connection = mocker.patch("metadeploy.api.jobs.get_connection")
+        pipe = get_connection.return_value.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [True]
+        job = self.claim(job_factory)
+
+        release_lost_claims()
+
+        job.refresh_from_db()
+        assert job.enqueued_at is not None
+        assert job.job_id is not None
+
+    def test_leaves_recent_and_finished(self, mocker, settings, job_factory):
+        settings.JOB_CLAIM_TIMEOUT_SECONDS = 300
+        get_connection = mocker.patch("metadeploy.api.jobs.get_connection")
+        recent = job_factory(
+            enqueued_at=timezone.now(), job_id="294fc6d2-0f3c-4877-b849-54184724b6b2"
+        )
+        finished = self.claim(job_factory, status=Job.Status.complete)
+
+        release_lost_claims()
+
+        assert not get_connection.called
+        for job in (recent, finished):
+            job.refresh_from_db()
+            assert job.enqueued_at is not None
+
+
+class StopDispatcher(BaseException):
+    pass
+
+
+@pytest.mark.django_db
+class TestDispatcher:
+    def test_enqueues_on_wake(self, mocker, settings):
+        settings.JOB_DISPATCHER_SWEEP_SECONDS = 5
+        enqueuer = mocker.patch("metadeploy.api.jobs.enqueuer")
+        enqueuer.side_effect = [None, None, StopDispatcher]
+        wait_for_jobs = mocker.patch("metadeploy.api.jobs.wait_for_jobs")
+
+        with pytest.raises(StopDispatcher):
+            dispatcher()
+
+        assert enqueuer.call_count == 3
+        wait_for_jobs.assert_called_with(5)
+
+    def test_reconnects(self, mocker, caplog):
+        enqueuer = mocker.patch("metadeploy.api.jobs.enqueuer")
+        enqueuer.side_effect = [None, None, StopDispatcher]
+        wait_for_jobs = mocker.patch("metadeploy.api.jobs.wait_for_jobs")
+        wait_for_jobs.side_effect = [OperationalError("gone away"), None]
+        close = mocker.patch("metadeploy.api.jobs.connection.close")
+
+        with pytest.raises(StopDispatcher):
+            dispatcher(timeout=1)
+
+        assert close.called
+        assert "lost its database connection" in caplog.text
+
+    def test_keeps_listening(self, mocker, caplog):
+        enqueuer = mocker.patch("metadeploy.api.jobs.enqueuer")
+        enqueuer.side_effect = [ConnectionError("Redis is down"), None, StopDispatcher]
+        wait_for_jobs = mocker.patch("metadeploy.api.jobs.wait_for_jobs")
+        close = mocker.patch("metadeploy.api.jobs.connection.close")
+
+        with pytest.raises(StopDispatcher):
+            dispatcher(timeout=1)
+
+        assert wait_for_jobs.call_count == 2
+        assert not close.called
+        assert "failed to enqueue Jobs" in caplog.text
+
+
+@pytest.mark.django_db(transaction=True)
+def test_wait_for_jobs(job_factory):
+    with connection.cursor() as cursor:
+        cursor.execute("LISTEN metadeploy_job_created")
+    job = job_factory()
+    connection.connection.poll()
+
+    assert [n.payload for n in connection.connection.notifies] == [str(job.id)]
+    wait_for_jobs(0)
+    assert connection.connection.notifies == []
 
 
 @pytest.mark.django_db
@@ -109,10 +276,6 @@ def test_malicious_zip_file(
 ):
     # TODO: I don't like this test at all. But there's a lot of IO that
     # this code causes, so I'm mocking it out.
-    mocker.patch("shutil.move")
-    mocker.patch("shutil.rmtree")
-    glob = mocker.patch("metadeploy.api.jobs.glob")
-    glob.return_value = ["test"]
     mocker.patch("github3.login")
     zip_info = MagicMock()
     zip_info.filename = "/etc/passwd"
@@ -128,20 +291,83 @@ def test_malicious_zip_file(
     user = user_factory()
     plan = plan_factory()
     steps = [step_factory(plan=plan)]
-    job = job_factory(user=user)
+    job = job_factory(user=user, plan=plan)
 
-    run_flows(
-        user=user,
-        plan=plan,
-        skip_tasks=steps,
-        organization_url=job.organization_url,
-        result_class=Job,
-        result_id=job.id,
-    )
+    run_flows(result_class=Job, result_id=job.id, skip_tasks=steps)
 
     assert not job_flow.called
 
 
+@pytest.mark.django_db
+def test_run_flows__archive_cache(
+    mocker, job_factory, user_factory, plan_factory, step_factory
+):
+    gh = mocker.patch("github3.login")
+    repo = gh.return_value.repository.return_value
+    repo.commit.return_value.sha = "abc123"
+    from_settings = mocker.patch("metadeploy.api.jobs.ArchiveCache.from_settings")
+    archive_cache = from_settings.return_value
+    # Bail out before trying to run the flow:
+    archive_cache.checkout.return_value = False
+
+    user = user_factory()
+    plan = plan_factory()
+    steps = [step_factory(plan=plan)]
+    job = job_factory(user=user, plan=plan)
+
+    run_flows(result_class=Job, result_id=job.id, skip_tasks=steps)
+
+    repo.commit.assert_called_once_with(plan.version.commit_ish)
+    assert archive_cache.checkout.call_args[1]["sha"] == "abc123"
+
+
+def make_zipball(path, names):
+    with zipfile.ZipFile(path, "w") as zip_file:
+        for name in names:
+            zip_file.writestr(name, "" if name.endswith("/") else name)
+
+
+def test_extract_zipball(tmp_path):
+    def archive(format_, *, path, ref):
+        make_zipball(
+            path,
+            [
+                "owner-repo-abc123/",
+                "owner-repo-abc123/cumulusci.yml",
+                "owner-repo-abc123/owner-repo-abc123/file.txt",
+                "owner-repo-abc123/.hidden",
+                "owner-repo-abc123/empty/",
+            ],
+        )
+
+    repo = MagicMock()
+    repo.archive.side_effect = archive
+
+    assert extract_zipball(repo, "abc123", str(tmp_path))
+    assert sorted(os.listdir(str(tmp_path))) == [
+        ".hidden",
+        "cumulusci.yml",
+        "empty",
+        "owner-repo-abc123",
+    ]
+    assert os.listdir(str(tmp_path / "empty")) == []
+    nested = tmp_path / "owner-repo-abc123" / "file.txt"
+    assert nested.read_text() == "owner-repo-abc123/owner-repo-abc123/file.txt"
+
+
+@pytest.mark.parametrize(
+    "name", ["/etc/passwd", "owner-repo-abc123/../../etc/passwd", "elsewhere/file"]
+)
+def test_extract_zip_file__unsafe(tmp_path, name):
+    archive = tmp_path / "archive.zip"
+    make_zipball(str(archive), ["owner-repo-abc123/cumulusci.yml", name])
+    dest = tmp_path / "dest"
+    dest.mkdir()
+
+    with zipfile.ZipFile(str(archive)) as zip_file:
+        assert not extract_zip_file(zip_file, str(dest))
+
+
 @pytest.mark.django_db
 def test_expire_user_tokens(user_factory):
     user1 = user_factory()
@@ -176,8 +402,8 @@ def test_preflight(mocker, user_factory, plan_factory, preflight_result_factory)
 def test_preflight_failure(
     mocker, user_factory, plan_factory, preflight_result_factory
 ):
-    glob = mocker.patch("metadeploy.api.jobs.glob")
-    glob.side_effect = Exception
+    extract_zipball = mocker.patch("metadeploy.api.jobs.extract_zipball")
+    extract_zipball.side_effect = Exception
     mocker.patch("github3.login")
 
     user = user_factory()
@@ -251,3 +477,49 @@ def test_mark_canceled_preflight(user_factory, plan_factory, preflight_result_fa
     except StopRequested:
         pass
     assert preflight.status == preflight.Status.canceled
+
+
+class TestPrefetchVersion:
+    def test_disabled(self, mocker):
+        get_github_repo = mocker.patch("metadeploy.api.jobs.get_github_repo")
+
+        prefetch_version("anything")
+
+        assert not get_github_repo.called
+
+    @pytest.mark.django_db
+    def test_no_repo_url(self, mocker, settings, tmp_path, version_factory):
+        settings.REPO_ARCHIVE_CACHE_DIR = str(tmp_path)
+        settings.REPO_ARCHIVE_CACHE_MAX_SIZE = 1000
+        get_github_repo = mocker.patch("metadeploy.api.jobs.get_github_repo")
+        version = version_factory(product__repo_url="")
+
+        prefetch_version(version.id)
+
+        assert not get_github_repo.called
+
+    @pytest.mark.django_db
+    def test_populates_cache(self, mocker, version_factory):
+        from_settings = mocker.patch("metadeploy.api.jobs.ArchiveCache.from_settings")
+        checkout = from_settings.return_value.checkout
+        get_github_repo = mocker.patch("metadeploy.api.jobs.get_github_repo")
+        repo = get_github_repo.return_value
+        repo.commit.return_value.sha = "abc123"
+        version = version_factory(commit_ish="v0.1.0")
+
+        prefetch_version(version.id)
+
+        repo.commit.assert_called_once_with("v0.1.0")
+        assert checkout.call_args[1]["sha"] == "abc123"
+        assert checkout.call_args[1]["dest"] is None
+
+    @pytest.mark.django_db
+    def test_unsafe(self, mocker, caplog, version_factory):
+        from_settings = mocker.patch("metadeploy.api.jobs.ArchiveCache.from_settings")
+        from_settings.return_value.checkout.return_value = False
+        mocker.patch("metadeploy.api.jobs.get_github_repo")
+        version = version_factory()
+
+        prefetch_version(version.id)
+
+        assert "Malformed or malicious zip file" in caplog.text
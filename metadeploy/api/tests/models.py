@@ -2,11 +2,14 @@ from datetime import timedelta
 
 import pytest
 from allauth.socialaccount.models import SocialAccount
+from django.contrib.auth.models import AnonymousUser
 from django.contrib.sites.models import Site
 from django.core.exceptions import MultipleObjectsReturned, ValidationError
 from django.utils import timezone
 
-from ..models import Job, SiteProfile, User, Version
+from ..constants import ORGANIZATION_DETAILS
+from ..models import Job, Product, SiteProfile, User, Version
+from ..push import preflight_invalidated, user_token_expired
 
 
 @pytest.mark.django_db
@@ -43,6 +46,7 @@ class TestUser:
         assert user.org_name == "Sample Org"
 
         user.socialaccount_set.all().delete()
+        user.refresh_from_db()
         assert user.org_name is None
 
     def test_org_type(self, user_factory):
@@ -50,6 +54,7 @@ class TestUser:
         assert user.org_type == "Developer Edition"
 
         user.socialaccount_set.all().delete()
+        user.refresh_from_db()
         assert user.org_type is None
 
     def test_social_account(self, user_factory):
@@ -58,6 +63,7 @@ class TestUser:
         assert user.social_account == user.socialaccount_set.first()
 
         user.socialaccount_set.all().delete()
+        user.refresh_from_db()
         assert user.social_account is None
 
     def test_instance_url(self, user_factory):
@@ -65,6 +71,7 @@ class TestUser:
         assert user.instance_url == "https://example.com"
 
         user.socialaccount_set.all().delete()
+        user.refresh_from_db()
         assert user.instance_url is None
 
     def test_token(self, user_factory):
@@ -72,6 +79,7 @@ class TestUser:
         assert user.token == ("0123456789abcdef", "secret.0123456789abcdef")
 
         user.socialaccount_set.all().delete()
+        user.refresh_from_db()
         assert user.token == (None, None)
 
     def test_valid_token_for(self, user_factory):
@@ -79,8 +87,110 @@ class TestUser:
         assert user.valid_token_for == "https://example.com"
 
         user.socialaccount_set.first().socialtoken_set.all().delete()
+        user.refresh_from_db()
         assert user.valid_token_for is None
 
+    def test_social_properties__cached(self, django_assert_num_queries, user_factory):
+        user = user_factory()
+        with django_assert_num_queries(2):
+            assert user.valid_token_for == "https://example.com"
+            assert user.org_name == "Sample Org"
+            assert user.org_type == "Developer Edition"
+            assert user.token == ("0123456789abcdef", "secret.0123456789abcdef")
+
+    def test_with_social_account(self, django_assert_num_queries, user_factory):
+        user = user_factory()
+        user = User.objects.with_social_account().get(pk=user.pk)
+
+        with django_assert_num_queries(0):
+            assert user.valid_token_for == "https://example.com"
+            assert user.org_name == "Sample Org"
+
+    def test_with_social_account__none(self, django_assert_num_queries, user_factory):
+        user = user_factory(socialaccount_set=[])
+        user = User.objects.with_social_account().get(pk=user.pk)
+
+        with django_assert_num_queries(0):
+            assert user.social_account is None
+            assert user.token == (None, None)
+
+    def test_expire_token(self, mocker, user_factory):
+        async_to_sync = mocker.patch("metadeploy.api.models.async_to_sync")
+        user = User.objects.with_social_account().get(pk=user_factory().pk)
+        assert user.valid_token_for == "https://example.com"
+
+        user.expire_token()
+
+        assert user.token == (None, None)
+        assert user.valid_token_for is None
+        async_to_sync.assert_called_with(user_token_expired)
+
+    def test_allowed_list_ids(
+        self, django_assert_num_queries, user_factory, allowed_list_org_factory
+    ):
+        allowed_list_org = allowed_list_org_factory()
+        allowed_list_org_factory()
+        user = user_factory()
+        social_account = user.socialaccount_set.first()
+        social_account.extra_data[ORGANIZATION_DETAILS]["Id"] = allowed_list_org.org_id
+        social_account.save()
+
+        assert user.allowed_list_ids == {allowed_list_org.allowed_list_id}
+        with django_assert_num_queries(0):
+            assert user.allowed_list_ids == {allowed_list_org.allowed_list_id}
+
+    def test_allowed_list_ids__no_org(self, user_factory):
+        user = user_factory()
+        user.socialaccount_set.all().delete()
+
+        assert user.allowed_list_ids == frozenset()
+
+
+@pytest.mark.django_db
+class TestAllowedListAccess:
+    def test_is_visible_to(
+        self,
+        django_assert_num_queries,
+        user_factory,
+        allowed_list_factory,
+        allowed_list_org_factory,
+        plan_factory,
+    ):
+        allowed_list_org = allowed_list_org_factory()
+        visible = plan_factory(visible_to=allowed_list_org.allowed_list)
+        hidden = plan_factory(visible_to=allowed_list_factory())
+        unrestricted = plan_factory()
+        user = user_factory()
+        social_account = user.socialaccount_set.first()
+        social_account.extra_data[ORGANIZATION_DETAILS]["Id"] = allowed_list_org.org_id
+        social_account.save()
+        user = User.objects.get(pk=user.pk)
+
+        with django_assert_num_queries(2):
+            assert visible.is_visible_to(user)
+            assert not hidden.is_visible_to(user)
+            assert unrestricted.is_visible_to(user)
+            assert visible.is_visible_to(user)
+
+    def test_is_visible_to__anonymous(self, allowed_list_factory, plan_factory):
+        plan = plan_factory(visible_to=allowed_list_factory())
+
+        assert not plan.is_visible_to(AnonymousUser())
+        assert plan_factory().is_visible_to(AnonymousUser())
+
+    def test_is_visible_to__superuser(
+        self,
+        django_assert_num_queries,
+        user_factory,
+        allowed_list_factory,
+        plan_factory,
+    ):
+        plan = plan_factory(visible_to=allowed_list_factory())
+        user = user_factory(is_superuser=True)
+
+        with django_assert_num_queries(0):
+            assert plan.is_visible_to(user)
+
 
 @pytest.mark.django_db
 class TestUserExpiredTokens:
@@ -341,6 +451,35 @@ class TestVersionNaturalKey:
         assert str(version) == "My Product, Version v0.1.0"
 
 
+@pytest.mark.django_db
+class TestVersionPrefetch:
+    def test_prefetch_on_create_and_commit_ish_change(
+        self, mocker, settings, version_factory
+    ):
+        settings.REPO_ARCHIVE_CACHE_MAX_SIZE = 1024
+        mocker.patch("django.db.transaction.on_commit", side_effect=lambda fn: fn())
+        delay = mocker.patch("metadeploy.api.jobs.prefetch_version_job.delay")
+
+        version = version_factory()
+        delay.assert_called_once_with(str(version.id))
+
+        version.label = "v0.2.0"
+        version.save()
+        assert delay.call_count == 1
+
+        version.commit_ish = "v0.2.0"
+        version.save()
+        assert delay.call_count == 2
+
+    def test_no_prefetch_without_archive_cache(self, mocker, version_factory):
+        mocker.patch("django.db.transaction.on_commit", side_effect=lambda fn: fn())
+        delay = mocker.patch("metadeploy.api.jobs.prefetch_version_job.delay")
+
+        version_factory()
+
+        assert not delay.called
+
+
 @pytest.mark.django_db
 def test_plan_post_install_markdown(plan_factory):
     msg = "This is a *sample* with some<script src='bad.js'></script> bad tags."
@@ -353,8 +492,81 @@ def test_plan_post_install_markdown(plan_factory):
     assert plan.post_install_message_additional_markdown == expected
 
 
+@pytest.mark.django_db
+def test_rendered_markdown_stored(product_factory):
+    product = product_factory(description="A *sample* product.")
+    translation = product.translations.get(language_code="en-us")
+
+    assert translation.description_html == "<p>A <em>sample</em> product.</p>"
+
+    product = Product.objects.get(pk=product.pk)
+    product.description = "A *changed* product."
+    product.save()
+    product = Product.objects.get(pk=product.pk)
+
+    assert product.description_markdown == "<p>A <em>changed</em> product.</p>"
+
+
 @pytest.mark.django_db
 class TestJob:
+    def test_record_step_result(
+        self, mocker, django_assert_num_queries, step_factory, job_factory
+    ):
+        async_to_sync = mocker.patch("metadeploy.api.models.async_to_sync")
+        step1 = step_factory()
+        step2 = step_factory(plan=step1.plan)
+        job = job_factory(plan=step1.plan)
+        edited_at = job.edited_at
+        # Written by someone else since we loaded the Job:
+        Job.objects.filter(pk=job.pk).update(
+            results={str(step1.id): [{"status": "ok"}]}
+        )
+        async_to_sync.reset_mock()
+
+        with django_assert_num_queries(1):
+            job.record_step_result(str(step2.id), [{"status": "error"}])
+
+        assert async_to_sync.call_count == 1
+        assert not job.tracker.has_changed("results")
+        job.refresh_from_db()
+        assert job.results == {
+            str(step1.id): [{"status": "ok"}],
+            str(step2.id): [{"status": "error"}],
+        }
+        assert job.error_count == 1
+        assert job.warning_count == 0
+        assert job.edited_at == edited_at
+
+    def test_record_step_result__runtime_error(self, mocker, caplog, job_factory):
+        job = job_factory()
+        mocker.patch(
+            "metadeploy.api.models.async_to_sync", side_effect=RuntimeError("loop")
+        )
+
+        job.record_step_result("abc", [{"status": "ok"}])
+
+        assert "RuntimeError: loop" in caplog.text
+
+    def test_result_summary(self, job_factory):
+        job = job_factory(results={"abc": [{"status": "warn"}]})
+        assert job.warning_count == 1
+
+        job.results["def"] = [{"status": "error"}, {"status": "warn"}]
+        job.save()
+        job.refresh_from_db()
+
+        assert job.error_count == 1
+        assert job.warning_count == 2
+
+    def test_full_log(self, job_factory):
+        job = job_factory(log="Legacy log\n")
+        job.append_log("First\n")
+        job.append_log("")
+        job.append_log("Second\n")
+
+        assert job.log_chunks.count() == 2
+        assert job.full_log == "Legacy log\nFirst\nSecond\n"
+
     def test_job_saves_click_through_text(self, plan_factory, job_factory):
         plan = plan_factory(version__product__click_through_agreement="Test")
         job = job_factory(plan=plan)
@@ -382,6 +594,72 @@ class TestJob:
         assert not preflight.is_valid
 
 
+@pytest.mark.django_db
+class TestJobQuerySet:
+    def test_skip_tasks_by_job(self, plan_factory, step_factory, job_factory):
+        plan1 = plan_factory()
+        plan2 = plan_factory()
+        step1 = step_factory(plan=plan1, path="task1")
+        step_factory(plan=plan1, path="task2")
+        step3 = step_factory(plan=plan2, path="task3")
+        job1 = job_factory(plan=plan1, steps=[step1])
+        job2 = job_factory(plan=plan2, steps=[step3])
+        job3 = job_factory(plan=plan2)
+
+        assert Job.objects.all().skip_tasks_by_job() == {
+            job1.id: ["task2"],
+            job2.id: [],
+            job3.id: ["task3"],
+        }
+
+    def test_invalidate_related_preflights(
+        self, mocker, job_factory, preflight_result_factory
+    ):
+        job1 = job_factory(organization_url="https://one.example.com")
+        job2 = job_factory(organization_url="https://two.example.com")
+        related = [
+            preflight_result_factory(
+                plan=job.plan, user=job.user, organization_url=job.organization_url
+            )
+            for job in (job1, job2)
+        ]
+        unrelated = preflight_result_factory(
+            plan=job1.plan, user=job1.user, organization_url=job2.organization_url
+        )
+        async_to_sync = mocker.patch("metadeploy.api.models.async_to_sync")
+        on_commit = mocker.patch("django.db.transaction.on_commit")
+
+        Job.objects.all().invalidate_related_preflights()
+
+        for preflight in related:
+            preflight.refresh_from_db()
+            assert not preflight.is_valid
+        unrelated.refresh_from_db()
+        assert unrelated.is_valid
+        assert not async_to_sync.called
+
+        for call in on_commit.call_args_list:
+            call[0][0]()
+        async_to_sync.assert_called_with(preflight_invalidated)
+        assert async_to_sync.return_value.call_count == 2
+
+    def test_invalidate_related_preflights__runtime_error(
+        self, mocker, caplog, job_factory, preflight_result_factory
+    ):
+        job = job_factory(organization_url="https://one.example.com")
+        preflight_result_factory(
+            plan=job.plan, user=job.user, organization_url=job.organization_url
+        )
+        mocker.patch("django.db.transaction.on_commit", side_effect=lambda fn: fn())
+        mocker.patch(
+            "metadeploy.api.models.async_to_sync", side_effect=RuntimeError("loop")
+        )
+
+        Job.objects.all().invalidate_related_preflights()
+
+        assert "RuntimeError: loop" in caplog.text
+
+
 @pytest.mark.django_db
 class TestSiteProfile:
     def test_markdown(self):
@@ -400,3 +678,27 @@ class TestSiteProfile:
         site = Site.objects.create(name="Test")
         site_profile = SiteProfile.objects.create(site=site, name="A name")
         assert str(site_profile) == "A name"
+
+
+@pytest.mark.django_db
+class TestPreflightResult:
+    def test_result_summary(self, user_factory, plan_factory, preflight_result_factory):
+        preflight = preflight_result_factory(
+            user=user_factory(),
+            plan=plan_factory(),
+            results={
+                "abc": [{"status": "optional"}],
+                "def": [{"status": "warn"}, {"status": "error"}],
+            },
+        )
+        assert preflight.optional_step_ids == ["abc"]
+        assert preflight.has_any_errors()
+
+        preflight.results = {"ghi": [{"status": "warn"}]}
+        preflight.save()
+        preflight.refresh_from_db()
+
+        assert preflight.error_count == 0
+        assert preflight.warning_count == 1
+        assert preflight.optional_step_ids == []
+        assert not preflight.has_any_errors()
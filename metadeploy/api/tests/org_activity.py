@@ -0,0 +1,105 @@
+import pytest
+from django.core.cache import cache
+
+from .. import org_activity
+from ..models import Job, PreflightResult
+from ..org_activity import get_org_activity, record_status_change
+
+ORG_URL = "https://example.com/"
+
+
+@pytest.fixture(autouse=True)
+def commit_immediately(mocker):
+    mocker.patch("django.db.transaction.on_commit", side_effect=lambda fn: fn())
+
+
+@pytest.mark.django_db
+class TestGetOrgActivity:
+    def test_nothing_running(self, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            assert get_org_activity(ORG_URL) == {
+                "current_job": None,
+                "current_preflight": None,
+            }
+        with django_assert_num_queries(0):
+            assert get_org_activity(ORG_URL) == {
+                "current_job": None,
+                "current_preflight": None,
+            }
+
+    def test_started(
+        self, django_assert_num_queries, job_factory, preflight_result_factory
+    ):
+        job = job_factory(organization_url=ORG_URL)
+        preflight = preflight_result_factory(
+            organization_url=ORG_URL, user=job.user, plan=job.plan
+        )
+
+        with django_assert_num_queries(0):
+            activity = get_org_activity(ORG_URL)
+
+        assert activity["current_job"]["id"] == str(job.id)
+        assert activity["current_job"]["plan_slug"] == job.plan.slug
+        assert activity["current_preflight"] == str(preflight.id)
+
+    def test_stopped(self, job_factory, preflight_result_factory):
+        job = job_factory(organization_url=ORG_URL)
+        preflight = preflight_result_factory(
+            organization_url=ORG_URL, user=job.user, plan=job.plan
+        )
+        job.status = Job.Status.complete
+        job.save()
+        preflight.status = PreflightResult.Status.failed
+        preflight.save()
+
+        assert get_org_activity(ORG_URL) == {
+            "current_job": None,
+            "current_preflight": None,
+        }
+
+    def test_other_org(self, job_factory):
+        job_factory(organization_url="https://other.example.com/")
+
+        assert get_org_activity(ORG_URL)["current_job"] is None
+
+    def test_miss(self, mocker, job_factory):
+        job = job_factory(organization_url=ORG_URL)
+        mocker.patch("metadeploy.api.org_activity.cache.get_many", return_value={})
+
+        assert get_org_activity(ORG_URL)["current_job"]["id"] == str(job.id)
+
+    def test_stale_read(self, mocker, job_factory):
+        job = job_factory(organization_url=ORG_URL)
+        from_db = org_activity._from_db
+
+        def stop_job_after_reading(org_url):
+            data = from_db(org_url)
+            if job.status == Job.Status.started:
+                job.status = Job.Status.complete
+                job.save()
+            return data
+
+        mocker.patch(
+            "metadeploy.api.org_activity._from_db", side_effect=stop_job_after_reading
+        )
+        cache.clear()
+
+        assert get_org_activity(ORG_URL)["current_job"]["id"] == str(job.id)
+        assert get_org_activity(ORG_URL)["current_job"] is None
+
+
+@pytest.mark.django_db
+class TestRecordStatusChange:
+    def test_plan_summary_cached(self, django_assert_num_queries, job_factory):
+        job = job_factory(organization_url=ORG_URL)
+        other_job = job_factory(plan=job.plan, organization_url=ORG_URL)
+
+        with django_assert_num_queries(0):
+            record_status_change(other_job)
+
+        assert get_org_activity(ORG_URL)["current_job"] == {
+            "id": str(other_job.id),
+            "product_slug": job.plan.version.product.slug,
+            "version_label": job.plan.version.label,
+            "plan_slug": job.plan.slug,
+        }
@@ -1,8 +1,15 @@
+import time
 from unittest.mock import MagicMock
 
 import pytest
 
-from ..push import notify_org_result_changed, report_error
+from ..push import (
+    Coalescer,
+    notify_org_result_changed,
+    notify_post_job,
+    notify_post_task,
+    report_error,
+)
 
 
 class AsyncMock(MagicMock):
@@ -33,3 +40,91 @@ async def test_notify_org_job_changed(mocker, user_factory, job_factory, plan_fa
     job = job_factory(user=user, plan=plan, organization_url="https://example.com/")
     await notify_org_result_changed(job)
     assert channel_layer.group_send.called
+
+
+def make_event(inner_type="TASK_COMPLETED"):
+    return {"type": "notify", "inner_type": inner_type}
+
+
+class TestCoalescer:
+    def test_sends_first_event(self, settings):
+        settings.PUSH_COALESCE_WINDOW_MS = 1000
+        coalescer = Coalescer(send=MagicMock())
+
+        assert coalescer.offer("job.1", make_event())
+        assert coalescer.offer("job.2", make_event())
+
+    def test_merges_within_window(self, settings):
+        settings.PUSH_COALESCE_WINDOW_MS = 50
+        send = MagicMock()
+        coalescer = Coalescer(send=send)
+        events = [make_event() for _ in range(4)]
+
+        assert coalescer.offer("job.1", events[0])
+        assert not any(coalescer.offer("job.1", event) for event in events[1:])
+        assert not send.called
+        time.sleep(0.2)
+
+        send.assert_called_once_with("job.1", events[-1])
+        assert events[-1]["merged"] == 2
+
+    def test_terminal_event_flushes(self, settings):
+        settings.PUSH_COALESCE_WINDOW_MS = 1000
+        send = MagicMock()
+        coalescer = Coalescer(send=send)
+        terminal = make_event("JOB_COMPLETED")
+
+        assert coalescer.offer("job.1", make_event())
+        assert not coalescer.offer("job.1", make_event())
+        assert coalescer.offer("job.1", terminal, flush=True)
+
+        # The held event was superseded, so it's never sent:
+        assert terminal["merged"] == 1
+        assert not coalescer._pending
+        assert "job.1" not in coalescer._last_sent
+        assert not send.called
+
+    def test_disabled(self, settings):
+        settings.PUSH_COALESCE_WINDOW_MS = 0
+        coalescer = Coalescer(send=MagicMock())
+
+        assert all(coalescer.offer("job.1", make_event()) for _ in range(3))
+
+    def test_forgets_old_groups(self, settings):
+        settings.PUSH_COALESCE_WINDOW_MS = 1
+        coalescer = Coalescer(send=MagicMock())
+        coalescer.MAX_TRACKED_GROUPS = 2
+        coalescer.offer("job.1", make_event())
+        coalescer.offer("job.2", make_event())
+        time.sleep(0.01)
+
+        coalescer.offer("job.3", make_event())
+
+        assert set(coalescer._last_sent) == {"job.3"}
+
+    def test_flush__nothing_pending(self):
+        send = MagicMock()
+        Coalescer(send=send).flush("job.1")
+
+        assert not send.called
+
+
+@pytest.mark.django_db
+@pytest.mark.asyncio
+async def test_push_serializable__coalesced(mocker, settings, job_factory):
+    settings.PUSH_COALESCE_WINDOW_MS = 1000
+    mocker.patch("metadeploy.api.push.coalescer", Coalescer(send=MagicMock()))
+    get_channel_layer = mocker.patch("metadeploy.api.push.get_channel_layer")
+    channel_layer = MagicMock(name="channel_layer")
+    channel_layer.group_send = AsyncMock(name="group_send")
+    get_channel_layer.return_value = channel_layer
+    job = job_factory(status="complete")
+
+    await notify_post_task(job)
+    await notify_post_task(job)
+    await notify_post_job(job)
+
+    sent_types = [
+        call[0][1]["inner_type"] for call in channel_layer.group_send.call_args_list
+    ]
+    assert sent_types == ["TASK_COMPLETED", "JOB_COMPLETED"]
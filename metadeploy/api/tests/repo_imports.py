@@ -0,0 +1,75 @@
+import sys
+import threading
+
+import pytest
+from cumulusci.core.tasks import BaseTask
+from cumulusci.core.utils import import_class
+
+from ..repo_imports import repo_imports
+
+TASK_MODULE = """
+from cumulusci.core.tasks import BaseTask
+
+from {package}.helpers import NAME
+
+
+class CustomTask(BaseTask):
+    name = NAME
+"""
+
+
+def write_repo(path, name, package="md_test_tasks"):
+    package_path = path / package
+    package_path.mkdir(parents=True)
+    (package_path / "__init__.py").write_text("")
+    (package_path / "helpers.py").write_text(f"NAME = {name!r}\n")
+    (package_path / "custom.py").write_text(TASK_MODULE.format(package=package))
+    return str(path)
+
+
+def test_repo_imports(tmp_path):
+    root = write_repo(tmp_path, "first")
+    path = sys.path.copy()
+
+    with repo_imports(root):
+        task_class = import_class("md_test_tasks.custom.CustomTask")
+        assert sys.path == path
+
+    assert issubclass(task_class, BaseTask)
+    assert task_class.name == "first"
+    assert not any(name.startswith("md_test_tasks") for name in sys.modules)
+    with pytest.raises(ImportError):
+        import_class("md_test_tasks.custom.CustomTask")
+
+
+def test_repo_imports__other_thread(tmp_path):
+    root = write_repo(tmp_path, "first")
+    errors = []
+
+    def import_elsewhere():
+        try:
+            import_class("md_test_tasks.custom.CustomTask")
+        except ImportError as error:
+            errors.append(error)
+
+    with repo_imports(root):
+        thread = threading.Thread(target=import_elsewhere)
+        thread.start()
+        thread.join()
+
+    assert len(errors) == 1
+
+
+def test_repo_imports__plain_directory(tmp_path, monkeypatch):
+    # An installed package, and a repo with a plain directory (no
+    # __init__.py) of the same name, as CumulusCI projects have robot/:
+    installed = tmp_path / "site-packages"
+    write_repo(installed, "installed", package="md_test_robot")
+    monkeypatch.syspath_prepend(str(installed))
+    repo = tmp_path / "repo"
+    (repo / "md_test_robot" / "Project").mkdir(parents=True)
+
+    with repo_imports(str(repo)):
+        from md_test_robot.helpers import NAME
+
+    assert NAME == "installed"
@@ -1,6 +1,8 @@
 import pytest
+from django.core.cache import cache
 
-from ..models import PreflightResult
+from ..constants import REDIS_JOB_LOG_TAIL_KEY
+from ..models import Job, PreflightResult
 from ..serializers import (
     JobSerializer,
     PlanSerializer,
@@ -267,6 +269,24 @@ class TestJob:
         assert serializer.data["org_name"] is None
         assert serializer.data["organization_url"] is None
 
+    def test_log_tail(self, rf, user_factory, job_factory):
+        user = user_factory()
+        request = rf.get("/")
+        request.user = user
+        running = job_factory(user=user)
+        finished = job_factory(user=user, status=Job.Status.complete)
+        public = job_factory(is_public=True)
+        for job in (running, finished, public):
+            cache.set(REDIS_JOB_LOG_TAIL_KEY.format(id=job.id), "Deploying")
+
+        def log_tail(job):
+            serializer = JobSerializer(instance=job, context=dict(request=request))
+            return serializer.data["log_tail"]
+
+        assert log_tail(running) == "Deploying"
+        assert log_tail(finished) is None
+        assert log_tail(public) is None
+
     def test_patch(self, rf, job_factory, plan_factory, user_factory):
         plan = plan_factory()
         user = user_factory()
@@ -1,8 +1,10 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from ..constants import ORGANIZATION_DETAILS
-from ..models import Job, PreflightResult
+from ..models import Job, Plan, PreflightResult
 
 
 def format_timestamp(value):
@@ -54,6 +56,7 @@ class TestJobViewset:
             "is_public": False,
             "user_can_edit": False,
             "message": "",
+            "log_tail": "",
             "edited_at": format_timestamp(job.edited_at),
         }
 
@@ -80,6 +83,7 @@ class TestJobViewset:
             "is_public": False,
             "user_can_edit": True,
             "message": "",
+            "log_tail": "",
             "edited_at": format_timestamp(job.edited_at),
         }
 
@@ -106,6 +110,7 @@ class TestJobViewset:
             "is_public": True,
             "user_can_edit": False,
             "message": "",
+            "log_tail": None,
             "edited_at": format_timestamp(job.edited_at),
         }
 
@@ -133,6 +138,7 @@ class TestJobViewset:
             "is_public": True,
             "user_can_edit": False,
             "message": "",
+            "log_tail": None,
             "edited_at": format_timestamp(job.edited_at),
         }
 
@@ -309,6 +315,80 @@ class TestBasicGetViews:
         }
 
 
+@pytest.mark.django_db
+class TestProductViewset:
+    def make_product(
+        self,
+        product_factory,
+        version_factory,
+        plan_factory,
+        step_factory,
+        visible_to=None,
+    ):
+        product = product_factory(visible_to=visible_to)
+        version = version_factory(product=product)
+        plan = plan_factory(version=version, visible_to=visible_to)
+        plan_factory(version=version, tier=Plan.Tier.secondary, visible_to=visible_to)
+        plan_factory(version=version, tier=Plan.Tier.additional)
+        step_factory(plan=plan)
+        step_factory(plan=plan)
+        return product
+
+    def test_list__most_recent_version(
+        self, client, product_factory, version_factory, plan_factory
+    ):
+        product = product_factory()
+        version_factory(product=product, label="v0.1.0")
+        version = version_factory(product=product, label="v0.2.0")
+        version_factory(product=product, label="v0.3.0", is_listed=False)
+        plan = plan_factory(version=version)
+
+        response = client.get(reverse("product-list"))
+
+        assert response.status_code == 200
+        [product_json] = response.json()
+        assert product_json["slug"] == product.slug
+        most_recent_version = product_json["most_recent_version"]
+        assert most_recent_version["id"] == str(version.id)
+        assert most_recent_version["primary_plan"]["id"] == str(plan.id)
+        assert most_recent_version["primary_plan"]["slug"] == plan.slug
+
+    @pytest.mark.parametrize("restricted", (False, True))
+    def test_list__constant_queries(
+        self,
+        client,
+        django_assert_num_queries,
+        allowed_list_org_factory,
+        product_factory,
+        version_factory,
+        plan_factory,
+        step_factory,
+        restricted,
+    ):
+        visible_to = None
+        if restricted:
+            allowed_list_org = allowed_list_org_factory()
+            social_account = client.user.socialaccount_set.first()
+            extra_data = social_account.extra_data
+            extra_data[ORGANIZATION_DETAILS]["Id"] = allowed_list_org.org_id
+            social_account.save()
+            visible_to = allowed_list_org.allowed_list
+        factories = (product_factory, version_factory, plan_factory, step_factory)
+        self.make_product(*factories, visible_to=visible_to)
+        client.get(reverse("product-list"))
+        with CaptureQueriesContext(connection) as one_product:
+            client.get(reverse("product-list"))
+
+        for _ in range(4):
+            self.make_product(*factories, visible_to=visible_to)
+        with django_assert_num_queries(len(one_product)):
+            response = client.get(reverse("product-list"))
+
+        assert response.status_code == 200
+        assert len(response.json()) == 5
+        assert all(product["is_allowed"] for product in response.json())
+
+
 @pytest.mark.django_db
 class TestPreflight:
     def test_post(self, client, plan_factory):
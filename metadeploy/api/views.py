@@ -7,14 +7,15 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from .catalog_cache import CatalogCacheMixin
 from .constants import REDIS_JOB_CANCEL_KEY
 from .jobs import preflight_job
 from .models import Job, Plan, PreflightResult, Product, Version
+from .org_activity import get_org_activity
 from .permissions import OnlyOwnerOrSuperuserCanDelete
 from .serializers import (
     FullUserSerializer,
     JobSerializer,
-    OrgSerializer,
     PlanSerializer,
     PreflightResultSerializer,
     ProductSerializer,
@@ -30,7 +31,7 @@ class UserView(generics.RetrieveAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
-        return self.model.objects.filter(id=self.request.user.id)
+        return self.model.objects.filter(id=self.request.user.id).with_social_account()
 
     def get_object(self):
         return self.get_queryset().get()
@@ -63,19 +64,19 @@ class JobViewSet(viewsets.ModelViewSet):
         cache.set(REDIS_JOB_CANCEL_KEY.format(id=instance.id), True)
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
     serializer_class = ProductSerializer
-    queryset = Product.objects.published()
+    queryset = Product.objects.published().with_related()
 
 
-class VersionViewSet(viewsets.ModelViewSet):
+class VersionViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
     serializer_class = VersionSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_fields = ("product", "label")
     queryset = Version.objects.all()
 
 
-class PlanViewSet(viewsets.ModelViewSet):
+class PlanViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
     serializer_class = PlanSerializer
     queryset = Plan.objects.all()
 
@@ -128,14 +129,4 @@ class OrgViewSet(viewsets.ViewSet):
         list endpoint, but does not take a pk, so we have to implement
         it this way.
         """
-        current_job = Job.objects.filter(
-            organization_url=request.user.instance_url, status=Job.Status.started
-        ).first()
-        current_preflight = PreflightResult.objects.filter(
-            organization_url=request.user.instance_url,
-            status=PreflightResult.Status.started,
-        ).first()
-        serializer = OrgSerializer(
-            {"current_job": current_job, "current_preflight": current_preflight}
-        )
-        return Response(serializer.data)
+        return Response(get_org_activity(request.user.instance_url))
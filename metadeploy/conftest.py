@@ -3,6 +3,7 @@ import factory.fuzzy
 import pytest
 from allauth.socialaccount.models import SocialAccount, SocialApp, SocialToken
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from pytest_factoryboy import register
 from rest_framework.test import APIClient
 from sfdo_template_helpers.crypto import fernet_encrypt
@@ -25,6 +26,11 @@ from metadeploy.api.models import (
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
 @register
 class SocialAppFactory(factory.django.DjangoModelFactory):
     class Meta:
@@ -1,24 +1,86 @@
-from collections import namedtuple
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict, namedtuple
 from importlib import import_module
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from django.apps import apps
+from django.conf import settings
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
 from django.utils.translation import gettext as _
 
 from .api.constants import CHANNELS_GROUP_NAME
 from .api.hash_url import convert_org_url_to_key
 
+logger = logging.getLogger(__name__)
+
 Request = namedtuple("Request", "user")
 
 
 KNOWN_MODELS = {"user", "preflightresult", "job", "org"}
 
+# Payloads for the most recent events, shared by every consumer in this
+# process. An event sent to a group reaches each subscriber's consumer
+# separately; sharing means the instance is fetched once per event, and
+# serialized once per audience rather than once per subscriber.
+SHARED_PAYLOADS_SIZE = 128
+shared_payloads = OrderedDict()
+shared_payloads_lock = threading.Lock()
+
+# Warn when a database call had to wait this long for a free thread:
+SLOW_DB_WAIT_SECONDS = 1
+
+_db_semaphores = weakref.WeakKeyDictionary()
+
+
+class SharedPayload:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.instance = None
+        self.by_audience = {}
+
 
 def user_context(user):
     return {"request": Request(user)}
 
 
+def db_semaphore():
+    loop = asyncio.get_event_loop()
+    if loop not in _db_semaphores:
+        _db_semaphores[loop] = asyncio.Semaphore(settings.WEBSOCKET_DB_CONCURRENCY)
+    return _db_semaphores[loop]
+
+
+async def run_in_db_thread(fn, *args, **kwargs):
+    """
+    Run fn, which may use the ORM, in a thread so it doesn't block the
+    event loop. At most WEBSOCKET_DB_CONCURRENCY run at once, so a burst
+    of events can't use up every database connection.
+    """
+    queued_at = time.perf_counter()
+    async with db_semaphore():
+        started_at = time.perf_counter()
+        try:
+            return await database_sync_to_async(fn)(*args, **kwargs)
+        finally:
+            finished_at = time.perf_counter()
+            wait = started_at - queued_at
+            context = {
+                "function": fn.__name__,
+                "wait_ms": round(wait * 1000, 1),
+                "run_ms": round((finished_at - started_at) * 1000, 1),
+            }
+            log = logger.warning if wait >= SLOW_DB_WAIT_SECONDS else logger.debug
+            log(
+                f"{fn.__name__} database call",
+                extra={"tag": "consumers.db", "context": context},
+            )
+
+
 class PushNotificationConsumer(AsyncJsonWebsocketConsumer):
     async def connect(self):
         await self.accept()
@@ -36,17 +98,47 @@ class PushNotificationConsumer(AsyncJsonWebsocketConsumer):
             await self.send_json(event["content"])
             return
         if "serializer" in event and "instance" in event and "inner_type" in event:
-            instance = self.get_instance(**event["instance"])
-            serializer = self.get_serializer(event["serializer"])
-            payload = {
-                "payload": serializer(
-                    instance=instance, context=user_context(self.scope["user"])
-                ).data,
-                "type": event["inner_type"],
-            }
-            await self.send_json(payload)
+            payload = await run_in_db_thread(self.get_payload, event)
+            await self.send_json({"payload": payload, "type": event["inner_type"]})
             return
 
+    def get_payload(self, event):
+        """
+        Serialize the instance an event is about, for this consumer's
+        user.
+
+        Serializers with per-user fields define an ``audience`` static
+        method, which groups users who see the same output. Users in the
+        same audience share one serialization per event.
+        """
+        user = self.scope["user"]
+        serializer = self.get_serializer(event["serializer"])
+        event_id = event.get("event_id")
+        if event_id is None:
+            instance = self.get_instance(**event["instance"])
+            return serializer(instance=instance, context=user_context(user)).data
+
+        with shared_payloads_lock:
+            shared = shared_payloads.get(event_id)
+            if shared is None:
+                shared = shared_payloads[event_id] = SharedPayload()
+                while len(shared_payloads) > SHARED_PAYLOADS_SIZE:
+                    shared_payloads.popitem(last=False)
+
+        # Consumers run this in separate threads; whoever gets here first
+        # does the work, and the rest wait for it:
+        with shared.lock:
+            if shared.instance is None:
+                shared.instance = self.get_instance(**event["instance"])
+            audience_fn = getattr(serializer, "audience", None)
+            audience = audience_fn(shared.instance, user) if audience_fn else None
+            key = (event["serializer"], audience)
+            if key not in shared.by_audience:
+                shared.by_audience[key] = serializer(
+                    instance=shared.instance, context=user_context(user)
+                ).data
+            return shared.by_audience[key]
+
     def get_instance(self, *, model, id):
         Model = apps.get_model("api", model)
         return Model.objects.get(pk=id)
@@ -59,7 +151,9 @@ class PushNotificationConsumer(AsyncJsonWebsocketConsumer):
         # Just used to subscribe to notification channels.
         is_valid = self.is_valid(content)
         is_known_model = self.is_known_model(content.get("model", None))
-        has_good_permissions = self.has_good_permissions(content)
+        has_good_permissions = await run_in_db_thread(
+            self.has_good_permissions, content
+        )
         all_good = is_valid and is_known_model and has_good_permissions
         if not all_good:
             await self.send_json({"error": _("Invalid subscription.")})
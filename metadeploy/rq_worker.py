@@ -1,5 +1,14 @@
+import errno
+import os
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
 from django.db import DatabaseError, InterfaceError, connections
-from rq.worker import HerokuWorker, Worker
+from rq.job import JobStatus
+from rq.utils import utcnow
+from rq.worker import HerokuWorker, StopRequested, Worker, WorkerStatus
 
 
 class ConnectionClosingWorkerMixin(object):
@@ -28,11 +37,126 @@ class ConnectionClosingWorkerMixin(object):
         return super().work(*args, **kwargs)
 
 
-class ConnectionClosingWorker(ConnectionClosingWorkerMixin, Worker):
+class ConcurrentWorkerMixin(object):
+    """
+    Mixin for rq workers to run up to RQ_WORKER_CONCURRENCY jobs at once.
+
+    Jobs mostly wait on GitHub and the Metadata API, so one worker process
+    can keep several going. Each still runs in its own forked work horse,
+    as CumulusCI changes the working directory and sys.path as it goes,
+    but the horses all share the memory of one worker rather than each
+    needing a worker process of its own. The worker forks the horses
+    itself, and a pool of threads waits on them, one per horse.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.concurrency = max(1, settings.RQ_WORKER_CONCURRENCY)
+        self._horse_slots = threading.BoundedSemaphore(self.concurrency)
+        self._horse_pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        self._horse_jobs = {}
+        self._horse_jobs_lock = threading.Lock()
+
+    def dequeue_job_and_maintain_ttl(self, timeout):
+        if self.concurrency == 1:
+            return super().dequeue_job_and_maintain_ttl(timeout)
+        # Only take a job off the queue once there's a horse free to run
+        # it, so that other workers can have it in the meantime:
+        while not self._horse_slots.acquire(timeout=self.job_monitoring_interval):
+            self.heartbeat()
+        if self._stop_requested:
+            self._horse_slots.release()
+            raise StopRequested()
+        try:
+            result = super().dequeue_job_and_maintain_ttl(timeout)
+        except BaseException:
+            self._horse_slots.release()
+            raise
+        if result is None:
+            self._horse_slots.release()
+        return result
+
+    def execute_job(self, job, queue):
+        if self.concurrency == 1:
+            return super().execute_job(job, queue)
+        pid = os.fork()
+        if pid == 0:  # pragma: nocover
+            os.environ["RQ_WORKER_ID"] = self.name
+            os.environ["RQ_JOB_ID"] = job.id
+            self.main_work_horse(job, queue)
+        self._horse_pid = pid
+        with self._horse_jobs_lock:
+            self._horse_jobs[pid] = job
+            self.set_state(WorkerStatus.BUSY)
+            self.procline(f"Running {len(self._horse_jobs)} horse(s)")
+        self._horse_pool.submit(self._wait_for_horse, pid, job)
+
+    def _wait_for_horse(self, pid, job):
+        try:
+            _, ret_val = os.waitpid(pid, 0)
+            self.handle_horse_exit(job, ret_val)
+        except Exception:
+            self.log.exception(f"Lost track of work horse {pid}")
+        finally:
+            with self._horse_jobs_lock:
+                del self._horse_jobs[pid]
+                if not self._horse_jobs:
+                    self.set_state(WorkerStatus.IDLE)
+            self._horse_slots.release()
+
+    def handle_horse_exit(self, job, ret_val):
+        """
+        What Worker.monitor_work_horse does once its horse has exited,
+        which it can't be used for here, as it relies on SIGALRM and so
+        only works in the main thread.
+        """
+        if ret_val == os.EX_OK:
+            return
+        job_status = job.get_status()
+        if job_status in (None, JobStatus.FINISHED, JobStatus.FAILED):
+            return
+        if not job.ended_at:
+            job.ended_at = utcnow()
+        self.handle_job_failure(job=job)
+        self.log.warning(
+            f"Moving job to {self.failed_queue.name!r} queue "
+            f"(work-horse terminated unexpectedly; waitpid returned {ret_val})"
+        )
+        self.failed_queue.quarantine(
+            job,
+            exc_info=(
+                "Work-horse process was terminated unexpectedly "
+                f"(waitpid returned {ret_val})"
+            ),
+        )
+
+    def kill_horse(self, sig=signal.SIGKILL):
+        if self.concurrency == 1:
+            return super().kill_horse(sig)
+        with self._horse_jobs_lock:
+            pids = list(self._horse_jobs)
+        for pid in pids:
+            try:
+                os.kill(pid, sig)
+            except OSError as e:
+                if e.errno != errno.ESRCH:
+                    raise
+
+    def register_death(self):
+        # A warm shutdown waits for every running horse, not just one:
+        self._horse_pool.shutdown(wait=True)
+        super().register_death()
+
+
+class ConnectionClosingWorker(
+    ConcurrentWorkerMixin, ConnectionClosingWorkerMixin, Worker
+):
     """Connection-closing worker for non-Heroku environments"""
 
 
-class ConnectionClosingHerokuWorker(ConnectionClosingWorkerMixin, HerokuWorker):
+class ConnectionClosingHerokuWorker(
+    ConcurrentWorkerMixin, ConnectionClosingWorkerMixin, HerokuWorker
+):
     """Connection-closing worker for Heroku
 
     The HerokuWorker prevents child workhorse processes from handling the
@@ -0,0 +1,200 @@
+"""
+Load tests for the websocket consumer and the RQ worker. These are slow
+and timing-sensitive, so they are excluded from the default test run.
+Run them with::
+
+    pytest -m benchmark -s metadeploy/tests/benchmarks.py
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.request import urlopen
+
+import pytest
+from channels.testing import WebsocketCommunicator
+from django_rq import get_connection
+from rq import Queue
+
+from ..api.push import notify_post_task
+from ..consumers import PushNotificationConsumer
+from ..rq_worker import ConnectionClosingWorker
+
+SOCKETS = 300
+EVENTS = 5
+# A stand-in for a round trip to a remote Postgres:
+QUERY_LATENCY = 0.005
+
+
+class LoopLagMonitor:
+    """
+    Measure how late the event loop runs a task that asks to be woken
+    every interval; any lateness is time the loop spent blocked.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.max_lag = 0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - start - self.interval
+            self.max_lag = max(self.max_lag, lag)
+
+    def __enter__(self):
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    def __exit__(self, *exc_info):
+        self._task.cancel()
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_notification_burst(mocker, user_factory, job_factory):
+    real_get_instance = PushNotificationConsumer.get_instance
+
+    def slow_get_instance(self, **kwargs):
+        time.sleep(QUERY_LATENCY)
+        return real_get_instance(self, **kwargs)
+
+    mocker.patch.object(PushNotificationConsumer, "get_instance", slow_get_instance)
+    job = job_factory(is_public=True)
+    users = [user_factory() for _ in range(SOCKETS)]
+    communicators = []
+    for user in users:
+        communicator = WebsocketCommunicator(
+            PushNotificationConsumer, "/ws/notifications/"
+        )
+        communicator.scope["user"] = user
+        await communicator.connect()
+        communicators.append(communicator)
+
+    with LoopLagMonitor() as subscribe_lag:
+        for communicator in communicators:
+            await communicator.send_json_to({"model": "job", "id": str(job.id)})
+        await asyncio.gather(*(c.receive_json_from() for c in communicators))
+
+    with LoopLagMonitor() as notify_lag:
+        start = time.perf_counter()
+        for _ in range(EVENTS):
+            await notify_post_task(job)
+            await asyncio.gather(
+                *(c.receive_json_from(timeout=10) for c in communicators)
+            )
+        elapsed = time.perf_counter() - start
+
+    for communicator in communicators:
+        await communicator.disconnect()
+
+    print()
+    print(
+        f"{SOCKETS} subscriptions, max loop lag: {subscribe_lag.max_lag * 1000:.1f}ms"
+    )
+    print(
+        f"{EVENTS} events to {SOCKETS} sockets in {elapsed * 1000:.1f}ms, "
+        f"max loop lag: {notify_lag.max_lag * 1000:.1f}ms"
+    )
+    # Run on the loop, the subscriptions alone would block it for
+    # SOCKETS * QUERY_LATENCY = 1.5s:
+    assert subscribe_lag.max_lag < SOCKETS * QUERY_LATENCY / 10
+    assert notify_lag.max_lag < SOCKETS * QUERY_LATENCY / 10
+
+
+WORKER_JOBS = 12
+# Stand-ins for the time a job spends waiting on a GitHub download, and on
+# each of its Metadata API status polls:
+DOWNLOAD_LATENCY = 0.2
+POLL_LATENCY = 0.05
+POLLS = 10
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class FakeRemoteHandler(BaseHTTPRequestHandler):
+    """
+    Answers /zipball like GitHub and /deployRequest/<n> like the Metadata
+    API, slowly.
+    """
+
+    def do_GET(self):
+        if self.path == "/zipball":
+            time.sleep(DOWNLOAD_LATENCY)
+            body = b"PK" + b"\0" * 64 * 1024
+        else:
+            time.sleep(POLL_LATENCY)
+            polls = int(self.path.rsplit("/", 1)[-1])
+            body = b"Succeeded" if polls >= POLLS else b"InProgress"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def fake_install(base_url):
+    """
+    What run_flows spends most of its time doing: downloading a repo,
+    then polling a deploy until it's done.
+    """
+    with urlopen(f"{base_url}/zipball") as response:
+        response.read()
+    polls = 0
+    while True:
+        with urlopen(f"{base_url}/deployRequest/{polls}") as response:
+            if response.read() == b"Succeeded":
+                return polls
+        polls += 1
+
+
+@pytest.fixture
+def fake_remote():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeRemoteHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def time_worker(settings, base_url, concurrency):
+    settings.RQ_WORKER_CONCURRENCY = concurrency
+    queue = Queue("benchmark", connection=get_connection("default"))
+    queue.empty()
+    jobs = [queue.enqueue(fake_install, base_url) for _ in range(WORKER_JOBS)]
+    worker = ConnectionClosingWorker([queue], connection=queue.connection)
+
+    start = time.perf_counter()
+    worker.work(burst=True)
+    elapsed = time.perf_counter() - start
+
+    assert [job.result for job in jobs] == [POLLS] * WORKER_JOBS
+    return elapsed
+
+
+@pytest.mark.benchmark
+def test_worker_throughput(settings, fake_remote):
+    elapsed = {
+        concurrency: time_worker(settings, fake_remote, concurrency)
+        for concurrency in (1, 4)
+    }
+
+    print()
+    for concurrency, seconds in elapsed.items():
+        print(
+            f"{WORKER_JOBS} jobs, {concurrency} at a time: {seconds * 1000:.1f}ms "
+            f"({WORKER_JOBS / seconds:.1f} jobs/s)"
+        )
+    # Nearly all of each job is spent waiting, so running four at once
+    # should take well under half as long:
+    assert elapsed[4] < elapsed[1] / 2
@@ -1,5 +1,11 @@
+import asyncio
+import threading
+import time
+import uuid
+
 import pytest
 from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
 
 from ..api.models import Job, PreflightResult
 from ..api.push import (
@@ -9,10 +15,10 @@ from ..api.push import (
     user_token_expired,
 )
 from ..api.serializers import JobSerializer, OrgSerializer, PreflightResultSerializer
-from ..consumers import PushNotificationConsumer, user_context
+from ..consumers import PushNotificationConsumer, run_in_db_thread, user_context
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=True)
 @pytest.mark.asyncio
 async def test_push_notification_consumer__user_token_invalid(user_factory):
     user = user_factory()
@@ -33,7 +39,7 @@ async def test_push_notification_consumer__user_token_invalid(user_factory):
     await communicator.disconnect()
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=True)
 @pytest.mark.asyncio
 async def test_push_notification_consumer__subscribe_preflight(
     user_factory, preflight_result_factory, plan_factory
@@ -67,7 +73,7 @@ async def test_push_notification_consumer__subscribe_preflight(
     await communicator.disconnect()
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=True)
 @pytest.mark.asyncio
 async def test_push_notification_consumer__subscribe_job(user_factory, job_factory):
     user = user_factory()
@@ -92,7 +98,7 @@ async def test_push_notification_consumer__subscribe_job(user_factory, job_facto
     await communicator.disconnect()
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=True)
 @pytest.mark.asyncio
 async def test_push_notification_consumer__subscribe_job__bad(
     user_factory, job_factory
@@ -115,7 +121,7 @@ async def test_push_notification_consumer__subscribe_job__bad(
     await communicator.disconnect()
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=True)
 @pytest.mark.asyncio
 async def test_push_notification_consumer__subscribe_job__missing(
     user_factory, job_factory
@@ -134,7 +140,7 @@ async def test_push_notification_consumer__subscribe_job__missing(
     await communicator.disconnect()
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=True)
 @pytest.mark.asyncio
 async def test_push_notification_consumer__subscribe_org(
     social_account_factory, user_factory, job_factory, plan_factory
@@ -176,3 +182,107 @@ async def test_push_notification_consumer__subscribe_org(
     }
 
     await communicator.disconnect()
+
+
+def make_job_event(job):
+    return {
+        "type": "notify",
+        "event_id": uuid.uuid4().hex,
+        "instance": {"model": "job", "id": str(job.id)},
+        "serializer": "metadeploy.api.serializers.JobSerializer",
+        "inner_type": "TASK_COMPLETED",
+    }
+
+
+@pytest.mark.django_db
+def test_get_payload__shared(
+    mocker, django_assert_num_queries, user_factory, job_factory
+):
+    owner = user_factory()
+    viewer1 = user_factory()
+    viewer2 = user_factory()
+    job = job_factory(user=owner, is_public=True)
+    event = make_job_event(job)
+    get_instance = mocker.spy(PushNotificationConsumer, "get_instance")
+
+    def get_payload(user):
+        consumer = PushNotificationConsumer({"type": "websocket", "user": user})
+        return consumer.get_payload(event)
+
+    owner_payload = get_payload(owner)
+    viewer1_payload = get_payload(viewer1)
+    with django_assert_num_queries(0):
+        viewer2_payload = get_payload(viewer2)
+
+    assert get_instance.call_count == 1
+    assert viewer2_payload is viewer1_payload
+    assert (
+        owner_payload == JobSerializer(instance=job, context=user_context(owner)).data
+    )
+    assert (
+        viewer1_payload
+        == JobSerializer(instance=job, context=user_context(viewer1)).data
+    )
+    assert owner_payload["user_can_edit"]
+    assert not viewer1_payload["user_can_edit"]
+
+
+@pytest.mark.django_db
+def test_get_payload__no_event_id(mocker, user_factory, job_factory):
+    user = user_factory()
+    job = job_factory(user=user)
+    event = make_job_event(job)
+    del event["event_id"]
+    get_instance = mocker.spy(PushNotificationConsumer, "get_instance")
+
+    for _ in range(2):
+        consumer = PushNotificationConsumer({"type": "websocket", "user": user})
+        consumer.get_payload(event)
+
+    assert get_instance.call_count == 2
+
+
+@pytest.mark.django_db
+def test_job_serializer_audience(user_factory, job_factory):
+    owner = user_factory()
+    staff = user_factory(is_staff=True)
+    job = job_factory(user=owner)
+
+    assert JobSerializer.audience(job, owner) == (True, True)
+    assert JobSerializer.audience(job, staff) == (True, False)
+    assert JobSerializer.audience(job, user_factory()) == (False, False)
+    assert JobSerializer.audience(job, AnonymousUser()) == (False, False)
+
+
+@pytest.mark.asyncio
+async def test_run_in_db_thread__concurrency(settings):
+    settings.WEBSOCKET_DB_CONCURRENCY = 2
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    def query():
+        with lock:
+            running.append(None)
+            max_running.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.pop()
+        return threading.get_ident()
+
+    thread_ids = await asyncio.gather(*(run_in_db_thread(query) for _ in range(6)))
+
+    assert max(max_running) == 2
+    assert threading.get_ident() not in thread_ids
+
+
+@pytest.mark.asyncio
+async def test_run_in_db_thread__slow_wait(mocker, caplog):
+    mocker.patch("metadeploy.consumers.SLOW_DB_WAIT_SECONDS", 0)
+
+    def query():
+        return "result"
+
+    assert await run_in_db_thread(query) == "result"
+    assert caplog.records[-1].getMessage() == "query database call"
+    assert caplog.records[-1].levelname == "WARNING"
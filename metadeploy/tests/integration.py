@@ -61,13 +61,6 @@ def test_can_reach_salesforce(
         preflight_flow_name="slow_steps_preflight_good", version=version
     )
     steps = [step_factory(plan=plan)]
-    job = job_factory(user=user)
+    job = job_factory(user=user, plan=plan, organization_url=INSTANCE_URL)
 
-    run_flows(
-        user=user,
-        plan=plan,
-        skip_tasks=steps,
-        organization_url=INSTANCE_URL,
-        result_class=Job,
-        result_id=job.id,
-    )
+    run_flows(result_class=Job, result_id=job.id, skip_tasks=steps)
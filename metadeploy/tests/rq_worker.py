@@ -1,8 +1,10 @@
-from unittest.mock import MagicMock
+import errno
+from unittest.mock import MagicMock, sentinel
 
 import pytest
 from django.db import DatabaseError, InterfaceError
 from django_rq import get_worker
+from rq.worker import StopRequested, WorkerStatus
 
 
 class TestConnectionClosingWorker:
@@ -68,3 +70,78 @@ class TestConnectionClosingWorker:
         worker.work(burst=True)
 
         assert close_database.called
+
+
+class TestConcurrentWorker:
+    @pytest.fixture
+    def worker(self, settings):
+        settings.RQ_WORKER_CONCURRENCY = 2
+        return get_worker()
+
+    def test_dequeue__stop_requested(self, worker):
+        worker._stop_requested = True
+
+        with pytest.raises(StopRequested):
+            worker.dequeue_job_and_maintain_ttl(None)
+        # The slot was given back:
+        assert worker._horse_slots.acquire(blocking=False)
+        assert worker._horse_slots.acquire(blocking=False)
+
+    def test_dequeue__empty(self, mocker, worker):
+        mocker.patch("rq.worker.Worker.dequeue_job_and_maintain_ttl", return_value=None)
+
+        assert worker.dequeue_job_and_maintain_ttl(None) is None
+        assert worker._horse_slots.acquire(blocking=False)
+        assert worker._horse_slots.acquire(blocking=False)
+
+    def test_execute_job(self, mocker, worker):
+        mocker.patch("os.fork", return_value=1234)
+        waitpid = mocker.patch("os.waitpid", return_value=(1234, 0))
+        handle_horse_exit = mocker.patch.object(worker, "handle_horse_exit")
+        job = MagicMock(id="job-id")
+        worker._horse_slots.acquire()
+
+        worker.execute_job(job, sentinel.queue)
+        worker._horse_pool.shutdown(wait=True)
+
+        waitpid.assert_called_once_with(1234, 0)
+        handle_horse_exit.assert_called_once_with(job, 0)
+        assert worker._horse_jobs == {}
+        assert worker.get_state() == WorkerStatus.IDLE
+        assert worker._horse_slots.acquire(blocking=False)
+        assert worker._horse_slots.acquire(blocking=False)
+
+    def test_execute_job__not_concurrent(self, mocker, settings):
+        settings.RQ_WORKER_CONCURRENCY = 1
+        execute_job = mocker.patch("rq.worker.Worker.execute_job")
+        worker = get_worker()
+
+        worker.execute_job(sentinel.job, sentinel.queue)
+
+        execute_job.assert_called_once_with(sentinel.job, sentinel.queue)
+
+    def test_handle_horse_exit__ok(self, worker):
+        job = MagicMock()
+        worker.handle_horse_exit(job, 0)
+        assert not job.get_status.called
+
+    def test_handle_horse_exit__crashed(self, mocker, worker):
+        handle_job_failure = mocker.patch.object(worker, "handle_job_failure")
+        worker.failed_queue = MagicMock()
+        job = MagicMock(ended_at=None)
+        job.get_status.return_value = "started"
+
+        worker.handle_horse_exit(job, 9)
+
+        handle_job_failure.assert_called_once_with(job=job)
+        assert worker.failed_queue.quarantine.called
+        assert job.ended_at is not None
+
+    def test_kill_horse(self, mocker, worker):
+        kill = mocker.patch("os.kill")
+        kill.side_effect = [None, OSError(errno.ESRCH, "No such process")]
+        worker._horse_jobs = {1: sentinel.first, 2: sentinel.second}
+
+        worker.kill_horse(sig=15)
+
+        assert [call[0] for call in kill.call_args_list] == [(1, 15), (2, 15)]